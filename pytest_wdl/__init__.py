@@ -19,7 +19,9 @@ module.
 """
 from pytest_wdl import fixtures
 from pytest_wdl.executors import ExecutionFailedError
-from pytest_wdl.loader import pytest_collection, pytest_collect_file
+from pytest_wdl.loader import (
+    pytest_collection, pytest_collect_file, pytest_sessionfinish
+)
 
 import pytest
 
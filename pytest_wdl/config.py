@@ -31,11 +31,15 @@ ENV_USER_CONFIG = "PYTEST_WDL_CONFIG"
 DEFAULT_USER_CONFIG_FILE = "pytest_wdl_config"
 ENV_CACHE_DIR = "PYTEST_WDL_CACHE_DIR"
 KEY_CACHE_DIR = "cache_dir"
+ENV_DOWNLOAD_CACHE_DIR = "PYTEST_WDL_DOWNLOAD_CACHE_DIR"
+KEY_DOWNLOAD_CACHE_DIR = "download_cache_dir"
 ENV_EXECUTION_DIR = "PYTEST_WDL_EXECUTION_DIR"
 KEY_EXECUTION_DIR = "execution_dir"
 KEY_PROXIES = "proxies"
 KEY_HTTP_HEADERS = "http_headers"
 KEY_SHOW_PROGRESS = "show_progress"
+KEY_PREFETCH_WORKERS = "prefetch_workers"
+KEY_DOWNLOAD_WORKERS = "download_workers"
 ENV_DEFAULT_EXECUTORS = "PYTEST_WDL_EXECUTORS"
 KEY_DEFAULT_EXECUTORS = "default_executors"
 DEFAULT_EXECUTORS = ["miniwdl"]
@@ -55,6 +59,9 @@ class UserConfiguration:
         remove_cache_dir: Whether to remove the cache directory; if None, takes the
             value True if a temp directory is used for caching, and False, if
             a value for `cache_dir` is specified.
+        download_cache_dir: The directory in which to cache downloaded remote files
+            between test sessions, keyed by URL. Files are only downloaded again if
+            their ETag changes. Defaults to None, which disables the download cache.
         execution_dir: The directory in which to run workflows. Defaults to None,
             which signals that a different temporary directory should be used for
             each workflow run.
@@ -69,6 +76,14 @@ class UserConfiguration:
             header is used for all URLs.
         show_progress: Whether to show progress bars when downloading remote test data
             files.
+        prefetch_workers: Number of threads to use for downloading all of a
+            module's remote test data files in the background as soon as the
+            module's test data is loaded. Defaults to 0, which disables prefetching,
+            so that each file is only downloaded when it is first used.
+        download_workers: Number of threads to use for downloading a single large
+            remote file in parallel byte ranges, if the server supports range
+            requests. Defaults to 1, which downloads each file over a single
+            connection.
         executors: Default set of executors to run.
         executor_defaults: Mapping of executor name to dict of executor-specific
             configuration options.
@@ -78,10 +93,13 @@ class UserConfiguration:
         config_file: Optional[Path] = None,
         cache_dir: Optional[Path] = None,
         remove_cache_dir: Optional[bool] = None,
+        download_cache_dir: Optional[Path] = None,
         execution_dir: Optional[Path] = None,
         proxies: Optional[Dict[str, Union[str, Dict[str, str]]]] = None,
         http_headers: Optional[List[dict]] = None,
         show_progress: Optional[bool] = None,
+        prefetch_workers: Optional[int] = None,
+        download_workers: Optional[int] = None,
         executors: Optional[str] = None,
         executor_defaults: Optional[Dict[str, dict]] = None,
         provider_defaults: Optional[Dict[str, dict]] = None,
@@ -112,6 +130,20 @@ class UserConfiguration:
 
         self.remove_cache_dir = remove_cache_dir
 
+        if not download_cache_dir:
+            download_cache_dir_str = os.environ.get(
+                ENV_DOWNLOAD_CACHE_DIR, defaults.get(KEY_DOWNLOAD_CACHE_DIR)
+            )
+            if download_cache_dir_str:
+                download_cache_dir = ensure_path(download_cache_dir_str)
+
+        if download_cache_dir:
+            self.download_cache_dir = ensure_path(
+                download_cache_dir, is_file=False, create=True
+            )
+        else:
+            self.download_cache_dir = None
+
         if not execution_dir:
             execution_dir_str = os.environ.get(
                 ENV_EXECUTION_DIR, defaults.get(KEY_EXECUTION_DIR)
@@ -143,6 +175,16 @@ class UserConfiguration:
         if self.show_progress is None:
             self.show_progress = defaults.get(KEY_SHOW_PROGRESS)
 
+        if prefetch_workers is None:
+            prefetch_workers = defaults.get(KEY_PREFETCH_WORKERS, 0)
+
+        self.prefetch_workers = prefetch_workers
+
+        if download_workers is None:
+            download_workers = defaults.get(KEY_DOWNLOAD_WORKERS, 1)
+
+        self.download_workers = download_workers
+
         if not executors:
             executors_str = os.environ.get(ENV_DEFAULT_EXECUTORS)
             # TODO: test multiple executors specified by environment variable
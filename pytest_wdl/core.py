@@ -11,10 +11,13 @@
 #    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
 from pathlib import Path
 import tempfile
-from typing import Any, Callable, List, Optional, Sequence, Type, Union, cast
+from typing import (
+    Any, Callable, Dict, List, Optional, Sequence, Type, Union, cast
+)
 
 from pytest_wdl.config import UserConfiguration
 from pytest_wdl.data_types import DEFAULT_TYPE, DataFile, DefaultDataFile
@@ -24,7 +27,7 @@ from pytest_wdl.localizers import (
 )
 from pytest_wdl.plugins import plugin_factory_map
 from pytest_wdl.url_schemes import install_schemes
-from pytest_wdl.utils import ensure_path
+from pytest_wdl.utils import LOG, ensure_path
 
 
 DATA_TYPES = plugin_factory_map(DataFile, "pytest_wdl.data_types")
@@ -36,6 +39,11 @@ EXECUTORS = plugin_factory_map(Executor, "pytest_wdl.executors")
 # Install URL scheme plugins
 install_schemes()
 
+# Marks a DataManager entry that has not been resolved yet
+_UNRESOLVED = object()
+# Number of threads used to prefetch data files when `prefetch_workers` is not set
+DEFAULT_PREFETCH_WORKERS = 8
+
 
 class DataDirs:
     """
@@ -132,15 +140,19 @@ class DataDirs:
 class DataResolver:
     """
     Resolves data files that may need to be localized.
+
+    If `user_config.prefetch_workers` is greater than zero, all remote data files
+    are downloaded in the background upon creation of the resolver.
     """
     def __init__(self, data_descriptors: dict, user_config: UserConfiguration):
         self.data_descriptors = data_descriptors
         self.user_config = user_config
-
-    def resolve(self, name: str, datadirs: Optional[DataDirs] = None):
-        if name in self.data_descriptors:
-            value = self.data_descriptors[name]
-
+        # Split the descriptors up front into file descriptors (keyword arguments
+        # for `create_data_file`) and other values, so that each lookup doesn't
+        # need to inspect the descriptor again
+        self._file_descriptors: Dict[str, dict] = {}
+        self._values = {}
+        for name, value in data_descriptors.items():
             if isinstance(value, dict):
                 # Right now, "class" is just a marker for object types, of which
                 # "file" is a special case.
@@ -148,20 +160,104 @@ class DataResolver:
                 if "value" in value:
                     value = value["value"]
                 if cls == "file":
-                    value = create_data_file(
-                        user_config=self.user_config,
-                        datadirs=datadirs,
-                        **cast(dict, value)
-                    )
+                    self._file_descriptors[name] = cast(dict, value)
+                    continue
+            self._values[name] = value
+        self._prefetched: Dict[str, Future] = {}
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        if user_config.prefetch_workers:
+            self.prefetch()
+
+    def prefetch(
+        self,
+        *names: str,
+        max_workers: Optional[int] = None,
+        datadirs: Optional[DataDirs] = None
+    ) -> None:
+        """
+        Starts localizing data files in background threads. Resolving a data file
+        waits for its localization to complete.
+
+        Args:
+            *names: Names of test data entries to localize. Defaults to all the
+                remote data files.
+            max_workers: Maximum number of files to localize concurrently. Defaults
+                to `user_config.prefetch_workers`, or to `DEFAULT_PREFETCH_WORKERS`
+                if that is not set.
+            datadirs: Data directories to search for data files.
+        """
+        if names:
+            descriptors = {
+                name: self._file_descriptors.get(name, {"name": name})
+                for name in names
+                if name not in self._values and name not in self._prefetched
+            }
         else:
-            value = create_data_file(
+            descriptors = {
+                name: value
+                for name, value in self._file_descriptors.items()
+                if name not in self._prefetched
+                and isinstance(value, dict)
+                and "url" in value
+            }
+
+        if not descriptors:
+            return
+
+        if self._prefetch_executor is None:
+            # The downloads run in the background until the resolver is closed
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=(
+                    max_workers or self.user_config.prefetch_workers or
+                    DEFAULT_PREFETCH_WORKERS
+                )
+            )
+        for name, value in descriptors.items():
+            data_file = create_data_file(
+                user_config=self.user_config, datadirs=datadirs, **value
+            )
+            self._prefetched[name] = self._prefetch_executor.submit(
+                lambda df: df.path, data_file
+            )
+
+    def close(self) -> None:
+        """
+        Cancels the pending prefetches and waits for those that are running to
+        complete, so that no downloads are still running when the test data
+        directories are removed.
+        """
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True)
+            self._prefetch_executor = None
+
+    def resolve(self, name: str, datadirs: Optional[DataDirs] = None):
+        if name in self._values:
+            return self._values[name]
+
+        if name in self._prefetched:
+            try:
+                self._prefetched.pop(name).result()
+            except Exception:
+                # The file will be localized again below, which raises the error
+                # if it persists
+                LOG.warning("Error prefetching %s", name, exc_info=True)
+
+        if name in self._file_descriptors:
+            return create_data_file(
+                user_config=self.user_config,
+                datadirs=datadirs,
+                **self._file_descriptors[name]
+            )
+        else:
+            return create_data_file(
                 name=name,
                 user_config=self.user_config,
                 datadirs=datadirs
             )
 
-        return value
-
 
 class DataManager:
     """
@@ -174,13 +270,32 @@ class DataManager:
     def __init__(self, data_resolver: DataResolver, datadirs: DataDirs):
         self.data_resolver = data_resolver
         self.datadirs = datadirs
+        self._values = {}
 
     def __getitem__(self, name: str):
-        return self.data_resolver.resolve(name, self.datadirs)
+        # Cache resolved values so that repeated lookups of the same name don't
+        # search the data directories or create new DataFiles
+        value = self._values.get(name, _UNRESOLVED)
+        if value is _UNRESOLVED:
+            value = self._values[name] = self.data_resolver.resolve(
+                name, self.datadirs
+            )
+        return value
 
     def get_list(self, *names: str) -> list:
         return [self[name] for name in names]
 
+    def prefetch(self, *names: str) -> None:
+        """
+        Starts localizing data files in the background, rather than one at a time
+        as their paths are first accessed. See `DataResolver.prefetch`.
+
+        Args:
+            *names: Names of test data entries to localize. Defaults to all the
+                remote data files.
+        """
+        self.data_resolver.prefetch(*names, datadirs=self.datadirs)
+
     def get_dict(self, *names: str, **params) -> dict:
         """
         Creates a dict with one or more entries from this DataManager.
@@ -214,7 +329,8 @@ def create_data_file(
     **kwargs
 ) -> DataFile:
     if isinstance(type, dict):
-        data_file_opts = cast(dict, type)
+        # Copy so that the data descriptor is not modified
+        data_file_opts = dict(cast(dict, type))
         type = data_file_opts.pop("name")
     else:
         data_file_opts = {}
@@ -12,18 +12,35 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 from abc import ABCMeta, abstractmethod
+import difflib
+import os
 from pathlib import Path
-from typing import Callable, Optional, Union, cast
-
-import subby
+import shutil
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Union, cast
 
 from pytest_wdl.localizers import Localizer
-from pytest_wdl.utils import compare_files_with_hash, ensure_path, tempdir
-from xphyle import guess_file_format
-from xphyle.utils import transcode_file
+from pytest_wdl.utils import (
+    COMPARE_HASH_NAME, compare_files_with_hash, ensure_path, tempdir
+)
 
 DEFAULT_TYPE = "default"
 ALLOWED_DIFF_LINES = "allowed_diff_lines"
+# Hashes are only used to test files for equality, not for security, so use a
+# hash function that is faster than MD5
+DEFAULT_COMPARE_DIGEST = COMPARE_HASH_NAME
+# Characters in the POSIX [[:space:]] class
+TRAILING_WHITESPACE = b" \t\n\r\f\v"
+DECOMPRESS_BLOCK_SIZE = 1024 * 1024
+GZIP_TRAILER_SIZE = 8
+GZIP_FORMATS = frozenset(("gz", "gzip"))
+# Marks the end of the lines of a file in count_diff_lines
+_NO_LINE = object()
+
+try:
+    # Intel ISA-L decompresses gzip files several times faster than zlib
+    from isal import igzip
+except ImportError:  # pragma: no-cover
+    igzip = None
 
 
 class DataFile(metaclass=ABCMeta):
@@ -50,18 +67,23 @@ class DataFile(metaclass=ABCMeta):
         self.local_path = local_path
         self.localizer = localizer
         self.compare_opts = compare_opts
+        # Set once the file is known to exist, so that subsequent accesses of
+        # `path` don't need to stat the file
+        self._localized = False
 
     @property
     def path(self) -> Path:
-        if not self.local_path.exists():
-            if self.localizer:
-                ensure_path(self.local_path, is_file=True, create=True)
-                self.localizer.localize(self.local_path)
-            else:
-                raise RuntimeError(
-                    f"Localization to {self.local_path} is required but no localizer "
-                    f"is defined"
-                )
+        if not self._localized:
+            if not self.local_path.exists():
+                if self.localizer:
+                    ensure_path(self.local_path, is_file=True, create=True)
+                    self.localizer.localize(self.local_path)
+                else:
+                    raise RuntimeError(
+                        f"Localization to {self.local_path} is required but no "
+                        f"localizer is defined"
+                    )
+            self._localized = True
         return self.local_path
 
     def __str__(self) -> str:
@@ -80,14 +102,15 @@ class DataFile(metaclass=ABCMeta):
         """
         Assert the contents of two files are equal.
 
-        If `allowed_diff_lines == 0`, files are compared using MD5 hashes, otherwise
-        their contents are compared using the linux `diff` command.
+        If `allowed_diff_lines == 0`, files are compared using their hashes (which
+        is skipped if their sizes differ), otherwise the number of lines that differ
+        between them is counted.
 
         Args:
             other: A `DataFile` or string file path.
 
         Raises:
-            AssertionError if the files are different.
+            AssertionError if the files are different or either file does not exist.
         """
         other_compare_opts = {}
         if isinstance(other, Path):
@@ -99,6 +122,16 @@ class DataFile(metaclass=ABCMeta):
             other_path = other_df.path
             other_compare_opts = other.compare_opts
 
+        # A missing file (e.g. an output that the workflow did not produce) is a
+        # comparison failure
+        for path in (self.path, other_path):
+            if not path.exists():
+                raise AssertionError(f"File {path} does not exist")
+
+        # A file is always equal to itself (e.g. if one path is a link to the other)
+        if os.path.samefile(self.path, other_path):
+            return
+
         self._assert_contents_equal(other_path, other_compare_opts)
 
     @abstractmethod
@@ -113,12 +146,16 @@ class DataFile(metaclass=ABCMeta):
 
 
 class DefaultDataFile(DataFile):
+    #: Name of the hash algorithm used to compare files for exact equality;
+    #: subclasses may override this.
+    compare_digest = DEFAULT_COMPARE_DIGEST
+
     def _assert_contents_equal(self, other_path: Path, other_opts: dict):
         allowed_diff_lines = self._get_allowed_diff_lines(other_opts)
         if allowed_diff_lines:
             assert_text_files_equal(self.path, other_path, allowed_diff_lines)
         else:
-            assert_binary_files_equal(self.path, other_path)
+            assert_binary_files_equal(self.path, other_path, self.compare_digest)
 
 
 def diff_default(file1: Path, file2: Path) -> int:
@@ -132,23 +169,65 @@ def diff_default(file1: Path, file2: Path) -> int:
     Returns:
         Number of different lines.
     """
-    with tempdir() as temp:
-        # Remove trailing whitespace, and ensure a newline at the end of the file
-        cmp_file1 = temp / "file1"
-        cmp_file2 = temp / "file2"
-        subby.run("sed 's/[[:space:]]*$//; $a\\'", stdin=file1, stdout=cmp_file1)
-        subby.run("sed 's/[[:space:]]*$//; $a\\'", stdin=file2, stdout=cmp_file2)
+    # Remove trailing whitespace, and ensure a newline at the end of the file
+    return count_diff_lines(_iter_stripped_lines(file1), _iter_stripped_lines(file2))
+
+
+def count_diff_lines(lines1: Iterable, lines2: Iterable) -> int:
+    """
+    Counts the changed lines in the way of `diff -y --suppress-common-lines`, i.e.
+    one per changed pair of lines plus one per added or deleted line. Lines are
+    matched up using `difflib.SequenceMatcher`, which does not always choose the
+    same matching as GNU diff, so the count may differ from that of `diff` when
+    the same lines occur several times in the changed parts of the files.
 
-        # diff - it would be possible to do this without sed using GNU diff with the
-        # `--ignore-trailing-space` option, but unfortunately that option is not
-        # available in macOS diff, which provides BSD versions of the tools by default.
-        cmds = [
-            f"diff -y --suppress-common-lines {cmp_file1} {cmp_file2}",
-            "grep -c '^'"
-        ]
+    Args:
+        lines1: Lines of the first file
+        lines2: Lines of the second file
 
-        # It's a valid result to have no lines match, so allow a grep returncode of 1
-        return int(subby.sub(cmds, allowed_return_codes=(0, 1)))
+    Returns:
+        Number of different lines.
+    """
+    # Test outputs usually differ in only a few places, if at all, so skip the
+    # common prefix as the lines are read; only the lines after the first
+    # difference are kept in memory.
+    iter1 = iter(lines1)
+    iter2 = iter(lines2)
+    rest1 = []
+    rest2 = []
+    for line1 in iter1:
+        line2 = next(iter2, _NO_LINE)
+        if line2 is _NO_LINE:
+            rest1.append(line1)
+            break
+        if line1 != line2:
+            rest1.append(line1)
+            rest2.append(line2)
+            break
+    rest1.extend(iter1)
+    rest2.extend(iter2)
+
+    # Skip the common suffix before matching up the remaining lines
+    end1 = len(rest1)
+    end2 = len(rest2)
+    while end1 and end2 and rest1[end1 - 1] == rest2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    if not (end1 and end2):
+        return end1 + end2
+
+    matcher = difflib.SequenceMatcher(None, rest1[:end1], rest2[:end2], autojunk=False)
+    return sum(
+        max(i2 - i1, j2 - j1)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+        if op != "equal"
+    )
+
+
+def _iter_stripped_lines(path: Path, fmt: Optional[str] = None) -> Iterator[bytes]:
+    with _open_decompressed(path, fmt) if fmt else open(path, "rb") as inp:
+        for line in inp:
+            yield line.rstrip(TRAILING_WHITESPACE)
 
 
 def assert_text_files_equal(
@@ -157,13 +236,22 @@ def assert_text_files_equal(
     allowed_diff_lines: int = 0,
     diff_fn: Callable[[Path, Path], int] = diff_default
 ) -> None:
+    from xphyle import guess_file_format
+
     fmt = guess_file_format(file1)
-    if fmt:
+    if fmt and diff_fn is diff_default:
+        # Read the decompressed lines directly rather than writing the
+        # decompressed files to disk first
+        diff_lines = count_diff_lines(
+            _iter_stripped_lines(file1, fmt),
+            _iter_stripped_lines(file2, fmt)
+        )
+    elif fmt:
         with tempdir() as temp:
             temp_file1 = temp / "file1"
             temp_file2 = temp / "file2"
-            transcode_file(file1, temp_file1, dest_compression=False)
-            transcode_file(file2, temp_file2, dest_compression=False)
+            _decompress_file(file1, temp_file1, fmt)
+            _decompress_file(file2, temp_file2, fmt)
             diff_lines = diff_fn(temp_file1, temp_file2)
     else:
         diff_lines = diff_fn(file1, file2)
@@ -175,16 +263,43 @@ def assert_text_files_equal(
         )
 
 
+def _decompress_file(infile: Path, outfile: Path, fmt: str) -> None:
+    with _open_decompressed(infile, fmt) as inp, open(outfile, "wb") as out:
+        shutil.copyfileobj(inp, out, DECOMPRESS_BLOCK_SIZE)
+
+
+def _open_decompressed(path: Path, fmt: str) -> BinaryIO:
+    if igzip and fmt in GZIP_FORMATS:
+        return igzip.open(path, "rb")
+
+    from xphyle import xopen
+
+    # Decompress in-process rather than spawning a system (de)compression tool
+    return xopen(path, "rb", use_system=False)
+
+
 def compare_gzip(file1: Path, file2: Path):
-    crc_size1 = subby.sub(f"gzip -lv {file1} | tail -1 | awk '{{print $2\":\"$7}}'")
-    crc_size2 = subby.sub(f"gzip -lv {file2} | tail -1 | awk '{{print $2\":\"$7}}'")
-    if crc_size1 != crc_size2:  # TODO: test this
+    # The same values reported by `gzip -lv`: the CRC32 and uncompressed size (mod
+    # 2^32) stored in the trailer of the last gzip member, i.e. the last 8 bytes
+    crc_size1 = _read_gzip_trailer(file1)
+    crc_size2 = _read_gzip_trailer(file2)
+    if crc_size1 != crc_size2:
         raise AssertionError(
             f"CRCs and/or uncompressed sizes differ between expected identical "
             f"gzip files {file1}, {file2}"
         )
 
 
+def _read_gzip_trailer(path: Path) -> bytes:
+    with open(path, "rb") as inp:
+        size = inp.seek(0, os.SEEK_END)
+        if size < GZIP_TRAILER_SIZE:
+            # Empty or truncated
+            raise AssertionError(f"{path} is not a valid gzip file")
+        inp.seek(-GZIP_TRAILER_SIZE, os.SEEK_END)
+        return inp.read(GZIP_TRAILER_SIZE)
+
+
 # TODO: allow user-defined comparators
 BINARY_COMPARATORS = {
     "gz": compare_gzip,
@@ -192,7 +307,11 @@ BINARY_COMPARATORS = {
 }
 
 
-def assert_binary_files_equal(file1: Path, file2: Path, digest: str = "md5") -> None:
+def assert_binary_files_equal(
+    file1: Path, file2: Path, digest: str = DEFAULT_COMPARE_DIGEST
+) -> None:
+    from xphyle import guess_file_format
+
     fmt = guess_file_format(file1)
     if fmt and fmt in BINARY_COMPARATORS:
         BINARY_COMPARATORS[fmt](file1, file2)
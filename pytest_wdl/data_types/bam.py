@@ -19,7 +19,8 @@ from enum import Enum
 from functools import partial
 from pathlib import Path
 import re
-from typing import Iterable, Optional
+import shutil
+from typing import BinaryIO, Iterable, Optional
 
 import subby
 
@@ -32,6 +33,10 @@ import pysam
 
 INVARIATE_COLUMNS = "1,2,5,10,11"
 ALL_COLUMNS = "1-11"
+UNSET_RE = re.compile(rb"UNSET-\w*\b")
+# Approximate size (in bytes) of the batches of SAM lines that are processed at
+# once
+READ_BATCH_SIZE = 1024 * 1024
 
 
 class Sorting(Enum):
@@ -159,45 +164,59 @@ def bam_to_sam(
     opts = []
     if headers:
         opts.append("-h")
-        headers = set(headers)
+        headers = set(header.encode() for header in headers)
     if min_mapq:
         opts.extend(["-q", str(min_mapq)])
-    sam = pysam.view(*opts, str(input_bam)).rstrip()
-    # Replace any randomly assigned readgroups with a common placeholder
-    sam = re.sub(r"UNSET-\w*\b", "UNSET-placeholder", sam)
-
-    lines = sam.splitlines(keepends=True)
-    header_lines = []
-    start = 0
-    if headers:
-        for i, line in enumerate(lines):
-            if not line.startswith("@"):
-                start = i
-                break
-            elif line[1:3] in headers:
-                header_lines.append(line)
-
-    body_lines = lines[start:]
-    if sorting is not Sorting.NONE:
-        with tempdir() as temp:
-            temp_sam = temp / f"output_{str(output_sam.stem)}.sam"
-            with open(temp_sam, "w") as out:
-                out.write("".join(body_lines))
-            if sorting is Sorting.COORDINATE:
-                sort_cols = "-k3,3 -k4,4n -k2,2n"
+    with tempdir() as temp:
+        # Have samtools write the SAM file directly rather than capturing its
+        # output as a string
+        view_sam = temp / "view.sam"
+        pysam.view(*opts, "-o", str(view_sam), str(input_bam), catch_stdout=False)
+
+        # Stream the SAM file rather than reading it into memory. SAM is ASCII
+        # text, so it is processed as bytes to avoid decoding and encoding it.
+        with open(view_sam, "rb") as inp, open(output_sam, "wb") as out:
+            line = inp.readline()
+            while line.startswith(b"@"):
+                if headers and line[1:3] in headers:
+                    out.write(_remove_randomness(line))
+                line = inp.readline()
+
+            if sorting is Sorting.NONE:
+                _write_reads(line, inp, out)
             else:
-                sort_cols = "-k1,1 -k2,2n"
-            sorted_sam = subby.sub(f"cat {str(temp_sam)} | sort {sort_cols}")
-            body_lines = [sorted_sam]
-
-    with open(output_sam, "w") as out:
-        out.write("".join(header_lines + body_lines))
+                reads_sam = temp / "reads.sam"
+                with open(reads_sam, "wb") as reads_out:
+                    _write_reads(line, inp, reads_out)
+                if sorting is Sorting.COORDINATE:
+                    sort_cols = ["-k3,3", "-k4,4n", "-k2,2n"]
+                else:
+                    sort_cols = ["-k1,1", "-k2,2n"]
+                sorted_sam = temp / "sorted.sam"
+                subby.run(
+                    [["sort", *sort_cols, "-o", str(sorted_sam), str(reads_sam)]]
+                )
+                with open(sorted_sam, "rb") as sorted_inp:
+                    shutil.copyfileobj(sorted_inp, out, READ_BATCH_SIZE)
+
+
+def _write_reads(first_read: bytes, inp: BinaryIO, out: BinaryIO):
+    # Normalize the reads in batches of lines rather than one line at a time,
+    # which greatly reduces the number of regex and write calls
+    out.write(_remove_randomness(first_read))
+    for batch in iter(partial(inp.readlines, READ_BATCH_SIZE), []):
+        out.write(_remove_randomness(b"".join(batch)))
+
+
+def _remove_randomness(sam: bytes) -> bytes:
+    # Replace any randomly assigned readgroups with a common placeholder
+    return UNSET_RE.sub(b"UNSET-placeholder", sam)
 
 
 def diff_bam_columns(file1: Path, file2: Path, columns: str) -> int:
     with tempdir() as temp:
         def make_comparable(inpath, output):
-            subby.run(f"cat {inpath} | cut -f {columns}", stdout=output)
+            subby.run([["cut", "-f", columns, str(inpath)]], stdout=output)
 
         cmp_file1 = temp / "cmp_file1"
         cmp_file2 = temp / "cmp_file2"
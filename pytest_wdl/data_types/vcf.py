@@ -21,14 +21,14 @@ of sample columns. Only works for single-sample VCFs.
 from functools import partial
 from pathlib import Path
 import re
+from typing import Iterable, Iterator
 
-import subby
+from pytest_wdl.data_types import (
+    DataFile, TRAILING_WHITESPACE, assert_text_files_equal, count_diff_lines
+)
 
-from pytest_wdl.data_types import DataFile, assert_text_files_equal, diff_default
-from pytest_wdl.utils import tempdir
 
-
-GENO_RE = re.compile("[|/]")
+GENO_RE = re.compile(b"[|/]")
 
 
 class VcfDataFile(DataFile):
@@ -51,27 +51,40 @@ class VcfDataFile(DataFile):
 
 
 def diff_vcf_columns(file1: Path, file2: Path, compare_phase: bool = False) -> int:
-    with tempdir() as temp:
-        def make_comparable(infile, outfile):
-            cmd = ["grep -vE '^#'", "cut -f 1-5,7,10", "cut -d ':' -f 1"]
-            # if the VCF file is empty or (for some reason) has no headers,
-            # grep will exit with return code 1
-            output = subby.sub(cmd, stdin=infile, allowed_return_codes=(0, 1))
-            with open(outfile, "wt") as out:
-                if compare_phase:
-                    out.write(output)
-                else:
-                    # Normalize the allele separator and sort the alleles
-                    for row in output.splitlines(keepends=True):
-                        r, g = row.rsplit("\t", 1)
-                        g_strip = g.rstrip()
-                        g_norm = "/".join(sorted(GENO_RE.split(g_strip)))
-                        out.write(f"{r}\t{g_norm}")
-                        if len(g) != len(g_strip):
-                            out.write("\n")
+    def read_comparable(infile):
+        with open(infile, "rb") as inp:
+            for row in comparable_rows(inp, compare_phase):
+                yield row.rstrip(TRAILING_WHITESPACE)
+
+    return count_diff_lines(read_comparable(file1), read_comparable(file2))
+
+
+def comparable_rows(
+    lines: Iterable[bytes], compare_phase: bool = False
+) -> Iterator[bytes]:
+    """
+    Filters out header lines and reduces each record to the CHROM, POS, ID, REF,
+    ALT, and FILTER columns and the first sample column, then truncates the record
+    at the first `:` (which leaves only the GT field of the sample column unless an
+    earlier column contains a `:`).
+
+    Args:
+        lines: Lines of a VCF file.
+        compare_phase: Whether to preserve phasing; otherwise the allele separator
+            is normalized and the alleles are sorted.
 
-        cmp_file1 = temp / "file1"
-        cmp_file2 = temp / "file2"
-        make_comparable(file1, cmp_file1)
-        make_comparable(file2, cmp_file2)
-        return diff_default(cmp_file1, cmp_file2)
+    Returns:
+        An iterator over the comparable rows, each ending with a newline.
+    """
+    for line in lines:
+        if line.startswith(b"#"):
+            continue
+        fields = line.rstrip(b"\r\n").split(b"\t")
+        if len(fields) > 1:
+            fields = fields[:5] + fields[6:7] + fields[9:10]
+        row = b"\t".join(fields).split(b":", 1)[0]
+        if not compare_phase and b"\t" in row:
+            # Normalize the allele separator and sort the alleles
+            r, g = row.rsplit(b"\t", 1)
+            row = r + b"\t" + b"/".join(sorted(GENO_RE.split(g.rstrip())))
+        yield row + b"\n"
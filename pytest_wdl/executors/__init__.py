@@ -12,25 +12,31 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 from abc import ABCMeta, abstractmethod
-import json
+import atexit
+import functools
+import hashlib
 import os
 from pathlib import Path
+import shutil
 import tempfile
 import textwrap
-from typing import Any, Optional, Sequence, Tuple, Union, cast
+from typing import TYPE_CHECKING, Any, Optional, Sequence, Tuple, Union, cast
 
 from pytest_wdl.data_types import DataFile
 from pytest_wdl.utils import (
-    ensure_path, safe_string, find_executable_path, find_in_classpath
+    dumps_json, ensure_path, safe_string, find_executable_path, find_in_classpath,
+    read_json, write_json
 )
 
-import WDL
-from WDL import Document, Error, Tree
+if TYPE_CHECKING:  # pragma: no-cover
+    from WDL import Document
 
 
 ENV_JAVA_HOME = "JAVA_HOME"
 ENV_JAVA_ARGS = "JAVA_ARGS"
 INDENT = " " * 16
+# Types of values that are passed to the executor without any formatting
+PRIMITIVE_TYPES = frozenset((str, int, float, bool, type(None)))
 
 
 class ExecutorError(Exception):
@@ -120,7 +126,9 @@ class Executor(metaclass=ABCMeta):
                 as the workflow inputs.
             expected: Dict mapping output parameter names to expected values.
             kwargs: Additional executor-specific keyword arguments (mostly for
-                debugging)
+                debugging). Local executors should also accept `execution_dir`:
+                the directory in which to run the workflow, which defaults to the
+                current working directory.
 
         Returns:
             Dict of outputs.
@@ -223,6 +231,11 @@ class JavaExecutor(Executor, metaclass=ABCMeta):
         java_bin: Optional[Union[str, Path]] = None,
         java_args: Optional[str] = None
     ):
+        self.java_bin = self.resolve_java_bin(java_bin)
+        self.java_args = java_args or os.environ.get(ENV_JAVA_ARGS)
+
+    @staticmethod
+    def resolve_java_bin(java_bin: Optional[Union[str, Path]] = None) -> Path:
         if not java_bin:
             java_home = os.environ.get(ENV_JAVA_HOME)
             if java_home:
@@ -233,11 +246,7 @@ class JavaExecutor(Executor, metaclass=ABCMeta):
         if not java_bin:
             raise FileNotFoundError("Could not find java executable")
 
-        self.java_bin = ensure_path(
-            java_bin, exists=True, is_file=True, executable=True
-        )
-
-        self.java_args = java_args or os.environ.get(ENV_JAVA_ARGS)
+        return ensure_path(java_bin, exists=True, is_file=True, executable=True)
 
     @staticmethod
     def resolve_jar_file(
@@ -271,10 +280,10 @@ class InputsFormatter:
         self, inputs_dict: dict, namespace: Optional[str] = None
     ) -> dict:
         prefix = f"{namespace}." if namespace else ""
-        return dict(
-            (f"{prefix}{key}", self.format_value(value))
+        return {
+            f"{prefix}{key}": self.format_value(value)
             for key, value in inputs_dict.items()
-        )
+        }
 
     def format_value(self, value: Any) -> Any:
         """
@@ -288,6 +297,11 @@ class InputsFormatter:
         Returns:
             The serializable value.
         """
+        # Most inputs are primitives, which can be returned without the more
+        # expensive attribute and ABC checks below
+        if type(value) in PRIMITIVE_TYPES:
+            return value
+
         if hasattr(value, "as_dict"):
             return value.as_dict()
 
@@ -306,7 +320,7 @@ class InputsFormatter:
         return [self.format_value(val) for val in s]
 
     def _format_dict(self, d: dict) -> dict:
-        return dict((key, self.format_value(val)) for key, val in d.items())
+        return {key: self.format_value(val) for key, val in d.items()}
 
     def _format_data_file(self, df: DataFile) -> Union[str, dict]:
         return df.path
@@ -317,7 +331,10 @@ def parse_wdl(
     import_dirs: Optional[Sequence[Path]] = (),
     check_quant: bool = False,
     **_
-) -> Document:
+) -> "Document":
+    # miniwdl is slow to import, so defer importing it until it is needed
+    import WDL
+
     return WDL.load(
         str(wdl_path),
         path=[str(path) for path in import_dirs],
@@ -327,7 +344,7 @@ def parse_wdl(
 
 def get_target_name(
     wdl_path: Optional[Path] = None,
-    wdl_doc: Optional[Document] = None,
+    wdl_doc: Optional["Document"] = None,
     task_name: Optional[str] = None,
     workflow_name: Optional[str] = None,
     **kwargs
@@ -363,7 +380,9 @@ def get_target_name(
     if workflow_name:
         return workflow_name, False
 
-    if not wdl_doc and Tree:
+    if not wdl_doc:
+        from WDL import Error
+
         try:
             wdl_doc = parse_wdl(wdl_path, **kwargs)
         except Error.SyntaxError as err:
@@ -395,8 +414,9 @@ def read_write_inputs(
     inputs_dict: Optional[dict] = None,
     inputs_formatter: Optional[InputsFormatter] = InputsFormatter.get_instance(),
     write_formatted_inputs: bool = True,
+    read_inputs_file: bool = True,
     **kwargs
-) -> Tuple[dict, Optional[Path]]:
+) -> Tuple[Optional[dict], Optional[Path]]:
     """
     If `inputs_file` is specified and it exists, read its contents. Otherwise, if
     `inputs_dict` is specified, format it using `inputs_formatter` (if specified) and
@@ -407,6 +427,8 @@ def read_write_inputs(
         inputs_dict:
         inputs_formatter:
         write_formatted_inputs:
+        read_inputs_file: Whether to read an existing `inputs_file`. If False, None
+            is returned in place of its contents.
         kwargs:
 
     Returns:
@@ -417,20 +439,51 @@ def read_write_inputs(
         inputs_file = ensure_path(inputs_file, is_file=True, create=True)
 
         if inputs_file.exists():
-            with open(inputs_file, "rt") as inp:
-                inputs_dict_from_file = json.load(inp)
-                return inputs_dict_from_file, inputs_file
+            return (read_json(inputs_file) if read_inputs_file else None), inputs_file
 
     if inputs_dict:
         inputs_dict = inputs_formatter.format_inputs(inputs_dict, **kwargs)
 
         if write_formatted_inputs:
-            if not inputs_file:
-                inputs_file = Path(tempfile.mkstemp(suffix=".json")[1])
-
-            with open(inputs_file, "wt") as out:
-                json.dump(inputs_dict, out, default=str)
+            if inputs_file:
+                write_json(inputs_dict, inputs_file, default=str)
+            else:
+                inputs_file = _write_cached_inputs(inputs_dict)
 
         return inputs_dict, inputs_file
 
     return {}, None
+
+
+def _write_cached_inputs(inputs_dict: dict) -> Path:
+    """
+    Writes inputs to a file in a session temporary directory that is named by the
+    hash of its contents, so tests that use the same inputs share a single file.
+
+    Args:
+        inputs_dict: The formatted inputs dict.
+
+    Returns:
+        The inputs file.
+    """
+    data = dumps_json(inputs_dict, default=str).encode()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    inputs_dir = _get_inputs_dir()
+    inputs_file = inputs_dir / f"inputs_{digest}.json"
+
+    if not inputs_file.exists():
+        # Write to a temporary file first so a concurrent test never reads a
+        # partially-written file
+        fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=inputs_dir)
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp_path, inputs_file)
+
+    return inputs_file
+
+
+@functools.lru_cache(maxsize=1)
+def _get_inputs_dir() -> Path:
+    inputs_dir = Path(tempfile.mkdtemp(prefix="pytest_wdl_inputs_"))
+    atexit.register(shutil.rmtree, inputs_dir, ignore_errors=True)
+    return inputs_dir
@@ -11,14 +11,16 @@
 #    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
-import glob
+import hashlib
 import json
+import mmap
+import os
 from pathlib import Path
 import re
 import tempfile
-from typing import Optional, Sequence, Union, cast
-
-import subby
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union, cast
+import zipfile
 
 from pytest_wdl.utils import LOG, ensure_path
 
@@ -27,6 +29,13 @@ ENV_CROMWELL_CONFIG = "CROMWELL_CONFIG"
 ENV_CROMWELL_ARGS = "CROMWELL_ARGS"
 ENV_JAVA_HOME = "JAVA_HOME"
 UNSAFE_RE = re.compile(r"[^\w.-]")
+OUTPUTS_RE = re.compile(r'^\{\s*"outputs"\s*:', re.MULTILINE)
+OUTPUTS_BYTES_RE = re.compile(rb'^\{\s*"outputs"\s*:', re.MULTILINE)
+MIN_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Temporary imports zip files, keyed by the names, sizes, and modification times of
+# the WDL files they contain, so that they can be reused between workflow runs
+_IMPORTS_ZIPS: Dict[str, Path] = {}
 
 
 class Failures:
@@ -86,30 +95,66 @@ class CromwellHelperMixin:
     """
 
     @classmethod
-    def _get_cromwell_outputs(cls, output) -> dict:
-        lines = output.splitlines(keepends=False)
+    def _get_cromwell_outputs(cls, output: Union[str, Path]) -> dict:
+        """
+        Parses the workflow outputs from Cromwell's stdout.
+
+        Args:
+            output: Cromwell's stdout, or a file to which it was written. A file is
+                memory-mapped and scanned in place rather than read into memory.
+
+        Returns:
+            Dict of outputs.
+        """
+        if isinstance(output, Path):
+            with open(output, "rb") as inp:
+                if os.fstat(inp.fileno()).st_size == 0:
+                    raise Exception(f"Invalid Cromwell output: {output} is empty")
+                with mmap.mmap(inp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return cls._parse_cromwell_outputs(
+                        mm, b"\n", b"Usage", OUTPUTS_BYTES_RE
+                    )
+        else:
+            return cls._parse_cromwell_outputs(output, "\n", "Usage", OUTPUTS_RE)
+
+    @staticmethod
+    def _parse_cromwell_outputs(output, newline, usage, outputs_re) -> dict:
+        # Only the first two lines are needed to check for errors
+        first_newline = output.find(newline)
+
+        if first_newline < 0:
+            raise Exception(f"Invalid Cromwell output: {output[:]}")
 
-        if len(lines) < 2:
-            raise Exception(f"Invalid Cromwell output: {output}")
+        second_newline = output.find(newline, first_newline + 1)
+        if second_newline < 0:
+            second_newline = len(output)
 
-        if lines[1].startswith("Usage"):
+        if output[first_newline + 1:second_newline].startswith(usage):
             # If the cromwell command is not valid, usage is printed and the
             # return code is 0 so it does not cause an exception above - we
             # have to catch it here.
             raise Exception("Invalid Cromwell command")
 
-        start = None
+        # Decode the outputs object in place rather than splitting stdout into lines
+        # and re-joining the lines of the JSON object
+        match = outputs_re.search(output)
 
-        for i, line in enumerate(lines):
-            if line == "{" and lines[i + 1].lstrip().startswith('"outputs":'):
-                start = i
-            elif line == "}" and start is not None:
-                end = i
-                break
-        else:
+        if match is None:
             raise AssertionError("No outputs JSON found in Cromwell stdout")
 
-        return json.loads("\n".join(lines[start:(end + 1)]))["outputs"]
+        start = match.start()
+        if isinstance(output, str):
+            text = output
+        else:
+            text = output[start:].decode()
+            start = 0
+
+        try:
+            outputs_json, _ = json.JSONDecoder().raw_decode(text, start)
+        except json.JSONDecodeError as err:
+            raise AssertionError("Invalid outputs JSON in Cromwell stdout") from err
+
+        return outputs_json["outputs"]
 
     @classmethod
     def _parse_metadata_errors(cls, metadata, target=None, error_kwargs=None):
@@ -184,6 +229,7 @@ class CromwellHelperMixin:
         """
         write_imports = bool(import_dirs)
         imports_path = None
+        imports_key = None
 
         if imports_file:
             imports_path = ensure_path(imports_file)
@@ -192,31 +238,78 @@ class CromwellHelperMixin:
                 write_imports = False
 
         if write_imports and import_dirs:
-            imports = [
-                wdl for path in import_dirs for wdl in glob.glob(str(path / "*.wdl"))
-            ]
+            imports = cls._find_wdl_files(import_dirs)
 
             if imports:
+                # Files are added without their directories (like `zip -j`), so
+                # their names must be unique
+                names = {}
+                for wdl, stat in imports:
+                    name = os.path.basename(wdl)
+                    if name in names:
+                        raise Exception(
+                            f"Error creating imports zip file; {wdl} and "
+                            f"{names[name][0]} have the same name"
+                        )
+                    names[name] = (wdl, stat)
+
                 if imports_path:
                     ensure_path(imports_path, is_file=True, create=True)
                 else:
-                    imports_path = Path(tempfile.mkstemp(suffix=".zip")[1])
+                    imports_key = cls._get_imports_key(imports)
+                    imports_path = _IMPORTS_ZIPS.get(imports_key)
+                    if imports_path and imports_path.exists():
+                        LOG.debug(f"Reusing imports zip file {imports_path}")
+                        return imports_path
+                    fd, imports_file_str = tempfile.mkstemp(suffix=".zip")
+                    os.close(fd)
+                    imports_path = Path(imports_file_str)
+
+                LOG.info(
+                    f"Writing imports {' '.join(wdl for wdl, _ in imports)} to zip "
+                    f"file {imports_path}"
+                )
 
-                imports_str = " ".join(imports)
+                # WDL files are small, so don't bother compressing them
+                with zipfile.ZipFile(imports_path, "w", zipfile.ZIP_STORED) as out:
+                    for name, (wdl, stat) in names.items():
+                        # ZIP does not support timestamps before 1980
+                        mtime = time.localtime(stat.st_mtime)
+                        info = zipfile.ZipInfo(name, max(mtime[:6], MIN_ZIP_DATE_TIME))
+                        with open(wdl, "rb") as inp:
+                            out.writestr(info, inp.read())
 
-                LOG.info(f"Writing imports {imports_str} to zip file {imports_path}")
+                if imports_key:
+                    _IMPORTS_ZIPS[imports_key] = imports_path
 
-                exe = subby.run(
-                    f"zip -j - {imports_str}",
-                    mode=bytes,
-                    stdout=imports_path,
-                    raise_on_error=False,
-                )
+        return imports_path
 
-                if not exe.ok:
-                    raise Exception(
-                        f"Error creating imports zip file; stdout={exe.output}; "
-                        f"stderr={exe.error}"
+    @staticmethod
+    def _find_wdl_files(
+        import_dirs: Sequence[Path]
+    ) -> List[Tuple[str, os.stat_result]]:
+        """
+        Lists the (non-hidden) WDL files in each of `import_dirs` along with their
+        stats, scanning each directory once.
+        """
+        imports = []
+        for path in import_dirs:
+            try:
+                with os.scandir(path) as entries:
+                    imports.extend(
+                        (entry.path, entry.stat())
+                        for entry in entries
+                        if entry.name.endswith(".wdl")
+                        and not entry.name.startswith(".")
+                        and entry.is_file()
                     )
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+        return imports
 
-        return imports_path
+    @staticmethod
+    def _get_imports_key(imports: Sequence[Tuple[str, os.stat_result]]) -> str:
+        stats = [
+            (wdl, stat.st_mtime_ns, stat.st_size) for wdl, stat in sorted(imports)
+        ]
+        return hashlib.blake2b(repr(stats).encode(), digest_size=8).hexdigest()
@@ -12,6 +12,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 import json
+import logging
 import os
 from pathlib import Path
 import tempfile
@@ -28,7 +29,7 @@ from pytest_wdl.executors import (
 from pytest_wdl.executors._cromwell import (
     ENV_CROMWELL_ARGS, ENV_CROMWELL_JAR, ENV_CROMWELL_CONFIG, CromwellHelperMixin
 )
-from pytest_wdl.utils import LOG, ensure_path
+from pytest_wdl.utils import LOG, dumps_json, ensure_path, read_json
 
 
 class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
@@ -84,8 +85,9 @@ class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
                 LOG.warn("'cromwell_configuration' is ignored when 'java_args' are set")
             else:
                 if isinstance(cromwell_configuration, dict):
-                    cromwell_config_file = Path(tempfile.mkstemp(suffix=".zip")[1])
-                    with open(cromwell_config_file, "wt") as out:
+                    fd, config_path = tempfile.mkstemp(suffix=".json")
+                    cromwell_config_file = Path(config_path)
+                    with open(fd, "wt") as out:
                         json.dump(cromwell_configuration, out)
                 else:
                     cromwell_config_file = ensure_path(
@@ -121,6 +123,8 @@ class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
                     written to this file only if it doesn't exist.
                 * java_args: Additional arguments to pass to Java runtime.
                 * cromwell_args: Additional arguments to pass to `cromwell run`.
+                * execution_dir: Directory in which to run Cromwell; defaults to the
+                    current working directory.
 
         Returns:
             Dict of outputs.
@@ -138,8 +142,13 @@ class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
                 "Cromwell cannot execute tasks independently of a workflow"
             )
 
+        # An existing inputs file is only read up front so that the inputs can be
+        # logged; otherwise it is read only if the execution fails
         inputs_dict, inputs_file = read_write_inputs(
-            inputs_file=kwargs.get("inputs_file"), inputs_dict=inputs, namespace=target
+            inputs_file=kwargs.get("inputs_file"),
+            inputs_dict=inputs,
+            namespace=target,
+            read_inputs_file=LOG.isEnabledFor(logging.INFO)
         )
         imports_file = self._get_workflow_imports(
             self._import_dirs, kwargs.get("imports_file")
@@ -149,25 +158,33 @@ class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
         imports_zip_arg = f"-p {imports_file}" if imports_file else ""
         java_args = kwargs.get("java_args", self.java_args) or ""
         cromwell_args = kwargs.get("cromwell_args", self._cromwell_args) or ""
-        metadata_file = Path.cwd() / "metadata.json"
+        execution_dir = kwargs.get("execution_dir")
+        metadata_file = (execution_dir or Path.cwd()) / "metadata.json"
+        # Cromwell's stdout can be large, so write it to a file rather than
+        # buffering it in memory; it is only read if the outputs need to be parsed
+        # from it or if there is an error
+        stdout_file = metadata_file.with_name("cromwell_stdout.log")
 
         cmd = (
             f"{self.java_bin} {java_args} -jar {self._cromwell_jar_file} run "
             f"-m {metadata_file} {cromwell_args} {inputs_arg} {imports_zip_arg} "
             f"{wdl_path}"
         )
-        LOG.info(
-            f"Executing cromwell command '{cmd}' with inputs "
-            f"{json.dumps(inputs_dict, default=str)}"
-        )
+        # Only serialize the inputs for logging if the message will be logged
+        if LOG.isEnabledFor(logging.INFO):
+            LOG.info(
+                f"Executing cromwell command '{cmd}' with inputs "
+                f"{dumps_json(inputs_dict, default=str)}"
+            )
 
-        exe = subby.run(cmd, raise_on_error=False)
+        exe = subby.run(
+            cmd, stdout=stdout_file, raise_on_error=False, cwd=execution_dir
+        )
 
         metadata = None
 
         if metadata_file.exists():
-            with open(metadata_file, "rt") as inp:
-                metadata = json.load(inp)
+            metadata = read_json(metadata_file)
 
         if exe.ok:
             if metadata:
@@ -178,14 +195,19 @@ class CromwellLocalExecutor(JavaExecutor, CromwellHelperMixin):
                     f"Cromwell command completed successfully but did not generate "
                     f"a metadata file at {metadata_file}"
                 )
-                outputs = self._get_cromwell_outputs(exe.output)
+                outputs = self._get_cromwell_outputs(stdout_file)
         else:
+            if inputs_dict is None:
+                # The inputs file was not read up front because the inputs were not
+                # logged, but they are needed to report the failure
+                inputs_dict = read_json(inputs_file)
+
             error_kwargs = {
                 "executor": "cromwell",
                 "target": target,
                 "status": "Failed",
                 "inputs": inputs_dict,
-                "executor_stdout": exe.output,
+                "executor_stdout": stdout_file.read_text(),
                 "executor_stderr": exe.error,
             }
             if metadata:
@@ -1,25 +1,153 @@
+import atexit
 import json
+import os
 from pathlib import Path
+import shlex
+import subprocess
+import tempfile
 import time
-from typing import IO, Optional, Sequence, Union
+from typing import IO, Dict, Optional, Sequence, Tuple, Union
 
 import requests
 from requests.auth import HTTPBasicAuth
 
 from pytest_wdl.executors import (
+    ENV_JAVA_ARGS,
     Executor,
     ExecutionFailedError,
+    JavaExecutor,
     get_target_name,
     read_write_inputs,
 )
-from pytest_wdl.executors._cromwell import CromwellHelperMixin
-from pytest_wdl.utils import LOG, PollingException, poll
+from pytest_wdl.executors._cromwell import ENV_CROMWELL_JAR, CromwellHelperMixin
+from pytest_wdl.utils import LOG, PollingException, dumps_json, poll
 
 
 DEFAULT_API_URL = "http://localhost:8000/api/workflows/v1"
 DEFAULT_POLLING_STEP = 5  # seconds
 DEFAULT_POLLING_TIMEOUT = 3600  # seconds
 TERMINAL_STATES = ["Succeeded", "Aborted", "Failed"]
+DEFAULT_SERVER_PORT = 8000
+DEFAULT_SERVER_STARTUP_TIMEOUT = 300  # seconds
+
+
+class CromwellServer:
+    """
+    A Cromwell server that is launched locally, so that workflows can be run without
+    starting a new JVM for each one. The server is stopped when the Python process
+    exits.
+
+    Args:
+        java_bin: Path to the java executable.
+        java_args: Java arguments to use.
+        cromwell_jar_file: Path to the Cromwell JAR file.
+        port: Port on which the server listens.
+    """
+    def __init__(
+        self,
+        java_bin: Path,
+        java_args: Optional[str],
+        cromwell_jar_file: Path,
+        port: int = DEFAULT_SERVER_PORT
+    ):
+        self.java_bin = java_bin
+        self.java_args = java_args
+        self.cromwell_jar_file = cromwell_jar_file
+        self.port = port
+        self.api_url = f"http://localhost:{port}/api/workflows/v1"
+        self.status_url = f"http://localhost:{port}/engine/v1/status"
+        self.log_file = None
+        self._process = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout: int = DEFAULT_SERVER_STARTUP_TIMEOUT) -> None:
+        """
+        Starts the server and waits until it is ready to accept requests.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the server to start.
+
+        Raises:
+            RuntimeError: if the server exits or does not become ready within
+                `timeout` seconds.
+        """
+        cmd = [str(self.java_bin)]
+        if self.java_args:
+            cmd.extend(shlex.split(self.java_args))
+        cmd.extend([
+            f"-Dwebservice.port={self.port}",
+            "-jar",
+            str(self.cromwell_jar_file),
+            "server"
+        ])
+
+        fd, log_file = tempfile.mkstemp(suffix=".log", prefix="cromwell_server_")
+        self.log_file = Path(log_file)
+        LOG.info(f"Starting Cromwell server '{' '.join(cmd)}'; logging to {log_file}")
+        with open(fd, "wb") as log:
+            self._process = subprocess.Popen(
+                cmd, stdout=log, stderr=subprocess.STDOUT
+            )
+        atexit.register(self.stop)
+
+        def is_ready():
+            if not self.is_running:
+                raise RuntimeError(
+                    f"Cromwell server exited with return code "
+                    f"{self._process.returncode}; see {self.log_file}"
+                )
+            with requests.get(self.status_url) as rsp:
+                return rsp.ok
+
+        try:
+            poll(
+                is_ready,
+                step=1,
+                timeout=timeout,
+                ignore_exceptions=(requests.ConnectionError,)
+            )
+        except PollingException as err:
+            self.stop()
+            raise RuntimeError(
+                f"Cromwell server did not start within {timeout} seconds; see "
+                f"{self.log_file}"
+            ) from err
+
+    def stop(self) -> None:
+        if self.is_running:
+            LOG.info("Stopping Cromwell server")
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+
+
+_SERVERS: Dict[Tuple, CromwellServer] = {}
+
+
+def get_cromwell_server(
+    java_bin: Path,
+    java_args: Optional[str],
+    cromwell_jar_file: Path,
+    port: int = DEFAULT_SERVER_PORT,
+    timeout: int = DEFAULT_SERVER_STARTUP_TIMEOUT
+) -> CromwellServer:
+    """
+    Gets the running Cromwell server with the given settings, starting it if
+    necessary. A single server is shared by all executors with the same settings.
+    """
+    key = (java_bin, java_args, cromwell_jar_file, port)
+    server = _SERVERS.get(key)
+    if server is None or not server.is_running:
+        server = CromwellServer(java_bin, java_args, cromwell_jar_file, port)
+        server.start(timeout)
+        _SERVERS[key] = server
+    return server
 
 
 class CromwellServerExecutor(Executor, CromwellHelperMixin):
@@ -36,6 +164,16 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
         cromwell_api_password: The password to pass to the cromwell API if protected by
             basic auth
         cromwell_configuration: A config file that will be passed to Cromwell
+        launch_server: Whether to launch a local Cromwell server rather than using
+            an existing one at `cromwell_api_url`. The server is started the first
+            time it is needed and shared by all workflow runs in the test session.
+        java_bin: Path to the java executable used to launch the server.
+        java_args: Java arguments to use when launching the server. Defaults to
+            the value of the $JAVA_ARGS environment variable.
+        cromwell_jar_file: Path to the Cromwell JAR file used to launch the server.
+        server_port: Port on which the launched server listens.
+        server_startup_timeout: Maximum number of seconds to wait for the launched
+            server to start.
     """
 
     def __init__(
@@ -45,8 +183,27 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
         cromwell_api_username: Optional[str] = None,
         cromwell_api_password: Optional[str] = None,
         cromwell_configuration: Optional[Union[str, Path, dict]] = None,
+        launch_server: bool = False,
+        java_bin: Optional[Union[str, Path]] = None,
+        java_args: Optional[str] = None,
+        cromwell_jar_file: Optional[Union[str, Path]] = None,
+        server_port: int = DEFAULT_SERVER_PORT,
+        server_startup_timeout: int = DEFAULT_SERVER_STARTUP_TIMEOUT,
     ):
         self._import_dirs = import_dirs
+
+        if launch_server:
+            server = get_cromwell_server(
+                JavaExecutor.resolve_java_bin(java_bin),
+                java_args or os.environ.get(ENV_JAVA_ARGS),
+                JavaExecutor.resolve_jar_file(
+                    "cromwell*.jar", cromwell_jar_file, ENV_CROMWELL_JAR
+                ),
+                server_port,
+                server_startup_timeout
+            )
+            cromwell_api_url = server.api_url
+
         self._cromwell_api_url = cromwell_api_url
         self._cromwell_config_file = cromwell_configuration
 
@@ -55,6 +212,10 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
         else:
             self._auth = None
 
+        # Use a session so that the connection to the server is kept alive between
+        # the submit, status polling, and metadata requests
+        self._session = requests.Session()
+
     def run_workflow(
         self,
         wdl_path: Path,
@@ -115,8 +276,11 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
         try:
             payload["workflowSource"] = open_payload_file(wdl_path)
 
+            # Serialize the inputs once, for both the request and the log message
+            inputs_json = dumps_json(inputs_dict, default=str)
+
             if inputs_dict:
-                payload["workflowInputs"] = json.dumps(inputs_dict, default=str)
+                payload["workflowInputs"] = inputs_json
 
             imports_file = self._get_workflow_imports(
                 self._import_dirs, kwargs.get("imports_file")
@@ -137,10 +301,10 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
 
             LOG.info(
                 f"Executing cromwell server '{self._cromwell_api_url}' with inputs "
-                f"{json.dumps(inputs_dict, default=str)}"
+                f"{inputs_json}"
             )
 
-            with requests.post(
+            with self._session.post(
                 self._cromwell_api_url, files=payload, auth=self._auth
             ) as resp:
                 status_object = self._resp_to_json(resp, target, inputs_dict)
@@ -163,7 +327,7 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
         metadata_url = f"{self._cromwell_api_url}/{run_id}/metadata"
         outputs = None
 
-        with requests.get(metadata_url, auth=self._auth) as metadata_response:
+        with self._session.get(metadata_url, auth=self._auth) as metadata_response:
             metadata = self._resp_to_json(metadata_response, target, inputs_dict)
 
             if metadata["status"] == "Succeeded":
@@ -217,7 +381,7 @@ class CromwellServerExecutor(Executor, CromwellHelperMixin):
             # and wait after each 404 error
             # see https://github.com/EliLillyCo/pytest-wdl/issues/155#issuecomment-750438858
             for i in range(num_retries):
-                with requests.get(status_url, auth=self._auth) as rsp:
+                with self._session.get(status_url, auth=self._auth) as rsp:
                     if rsp.status_code == 404:
                         time.sleep(retry_interval)
                     else:
@@ -53,6 +53,8 @@ class MiniwdlExecutor(Executor):
                 * task_name: Name of the task to run if a workflow isn't defined.
                 * inputs_file: Path to the miniwdl inputs file to use. Inputs are
                     written to this file only if it doesn't exist.
+                * execution_dir: Directory in which to run miniwdl; defaults to the
+                    current working directory.
 
         Returns:
             Dict of outputs.
@@ -84,7 +86,7 @@ class MiniwdlExecutor(Executor):
             f"miniwdl run --error-json --copy-input-files {input_arg} {task_arg} "
             f"{quant_arg} {path_arg} {wdl_path}"
         )
-        exe = subby.run(cmd, raise_on_error=False)
+        exe = subby.run(cmd, raise_on_error=False, cwd=kwargs.get("execution_dir"))
 
         # miniwdl writes out either outputs or error in json format to stdout
         results = json.loads(exe.output)
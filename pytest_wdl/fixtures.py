@@ -19,7 +19,8 @@ Note: This library is being transitioned to python3 only, and to use `pathlib.Pa
 instead of string paths. For backward compatibility fixtures that produce a path may
 still return string paths, but this support will be dropped in a future version.
 """
-import json
+import functools
+import os
 from pathlib import Path
 from typing import Callable, List, Optional, Sequence, Tuple, Union
 
@@ -29,7 +30,7 @@ from pytest_subtests import SubTests
 from pytest_wdl import config
 from pytest_wdl.config import UserConfiguration
 from pytest_wdl.core import DataResolver, DataManager, DataDirs, create_executor
-from pytest_wdl.utils import ensure_path, context_dir, find_project_path
+from pytest_wdl.utils import ensure_path, context_dir, find_project_path, read_json
 
 try:
     from ruamel import yaml
@@ -132,13 +133,24 @@ def workflow_data_descriptors(
         is_file=True,
         exists=True,
     )
-    with open(workflow_data_descriptor_path, "rt") as inp:
-        if yaml and workflow_data_descriptor_path.suffix == ".yaml":
+    # Typically many test modules share the same data descriptor file, so it is
+    # only parsed again if it has been modified. The nested descriptors are treated
+    # as read-only; only the top-level dict is copied.
+    return dict(_load_data_descriptors(
+        workflow_data_descriptor_path,
+        workflow_data_descriptor_path.stat().st_mtime_ns
+    ))
+
+
+@functools.lru_cache(maxsize=32)
+def _load_data_descriptors(path: Path, mtime_ns: int) -> dict:
+    if yaml and path.suffix == ".yaml":
+        with open(path, "rt") as inp:
             yaml_loader = yaml.YAML(typ="safe")
             yaml_loader.default_flow_style = False
             return yaml_loader.load(inp)
-        else:
-            return json.load(inp)
+    else:
+        return read_json(path)
 
 
 def workflow_data_resolver(
@@ -151,7 +163,11 @@ def workflow_data_resolver(
         workflow_data_descriptors: workflow_data_descriptors fixture.
         user_config:
     """
-    return DataResolver(workflow_data_descriptors, user_config)
+    resolver = DataResolver(workflow_data_descriptors, user_config)
+    try:
+        yield resolver
+    finally:
+        resolver.close()
 
 
 def workflow_data(
@@ -214,16 +230,18 @@ def import_dirs(
         if not import_paths.exists():
             raise FileNotFoundError(f"import_paths file {import_paths} does not exist")
 
-        paths = []
-
         with open(import_paths, "rt") as inp:
-            for path_str in inp.read().splitlines(keepends=False):
-                path = Path(path_str)
-                if not path.is_absolute():
-                    path = ensure_path(project_root / path)
-                if not path.exists():
-                    raise FileNotFoundError(f"Invalid import path: {path}")
-                paths.append(path)
+            paths = [
+                Path(path_str) if os.path.isabs(path_str)
+                else ensure_path(project_root / path_str)
+                for path_str in inp.read().splitlines(keepends=False)
+                if path_str
+            ]
+
+        # Report all of the invalid paths at once
+        missing = [str(path) for path in paths if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"Invalid import path(s): {', '.join(missing)}")
 
         return paths
     else:
@@ -352,9 +370,13 @@ class WorkflowRunner:
         Returns:
             Tuple of (executors, call_kwargs).
         """
-        wdl_path = ensure_path(
-            wdl_script, self._wdl_search_paths, is_file=True, exists=True
-        )
+        wdl_search_paths = tuple(self._wdl_search_paths)
+        wdl_path = _resolve_wdl_path(wdl_script, wdl_search_paths)
+        if not wdl_path.exists():
+            # The WDL file was moved or deleted since it was resolved
+            wdl_path = ensure_path(
+                wdl_script, wdl_search_paths, is_file=True, exists=True
+            )
 
         if args:
             args_list = list(args)
@@ -402,16 +424,51 @@ class WorkflowRunner:
         callback: Optional[Callable[[str, Path, dict], None]] = None,
         **kwargs
     ) -> dict:
-        executor = create_executor(executor_name, self._import_dirs, self._user_config)
+        executor = _get_executor(
+            executor_name, tuple(self._import_dirs), self._user_config
+        )
 
-        with context_dir(
-            self._user_config.default_execution_dir, change_dir=True
-        ) as execution_dir:
+        # The execution directory is passed to the executor rather than changed to,
+        # since the current directory is shared by all threads in the process
+        with context_dir(self._user_config.default_execution_dir) as execution_dir:
             outputs = executor.run_workflow(
-                wdl_path, inputs=inputs, expected=expected, **kwargs
+                wdl_path,
+                inputs=inputs,
+                expected=expected,
+                execution_dir=execution_dir,
+                **kwargs
             )
 
             if callback:
                 callback(executor_name, execution_dir, outputs)
 
             return outputs
+
+
+@functools.lru_cache(maxsize=32)
+def _get_executor(
+    executor_name: str, import_dirs: Tuple[Path, ...], user_config: UserConfiguration
+):
+    # Executors resolve their configuration (e.g. finding the java executable and
+    # JAR files) when they are created, so they are shared by all the tests in the
+    # session that use the same executor, import directories, and configuration
+    return create_executor(executor_name, import_dirs, user_config)
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_wdl_path(
+    wdl_script: Union[str, Path], wdl_search_paths: Tuple[Path, ...]
+) -> Path:
+    # Parameterized tests often run the same WDL many times, so the path is only
+    # searched for and checked once
+    return ensure_path(wdl_script, wdl_search_paths, is_file=True, exists=True)
+
+
+def clear_fixture_caches():
+    """
+    Clears the executors and WDL paths cached during the session, so that they
+    are not reused by a later session in the same process. Called at the end of
+    each test session.
+    """
+    _get_executor.cache_clear()
+    _resolve_wdl_path.cache_clear()
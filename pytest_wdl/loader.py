@@ -3,7 +3,8 @@ import json
 from typing import Any, IO, Optional, Sequence, cast
 
 from pytest_wdl.core import DataDirs, DataManager, DataResolver
-from pytest_wdl.utils import ensure_path
+from pytest_wdl.fixtures import clear_fixture_caches
+from pytest_wdl.utils import clear_path_caches, ensure_path
 
 from py.path import local
 import pytest
@@ -22,6 +23,16 @@ def pytest_collection(session: pytest.Session):
     print()
 
 
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int):
+    """
+    Clears paths and executors cached during the session, so that a later session
+    in the same process (e.g. when running pytest programmatically) does not reuse
+    them.
+    """
+    clear_path_caches()
+    clear_fixture_caches()
+
+
 def pytest_collect_file(path: local, parent) -> Optional[pytest.File]:
     if path.basename.startswith("test") and not path.basename.startswith("test_data."):
         if path.ext == ".json":
@@ -110,39 +121,51 @@ class TestItem(pytest.Item):
         self._fixture_request._fillfixtures()
 
     def runtest(self):
-        # Get/create DataManager
-        if self._data:
-            config = self._fixture_request.getfixturevalue("user_config")
-            data_resolver = DataResolver(self._data, config)
-            data_dirs = DataDirs(
-                ensure_path(self._fixture_request.fspath.dirpath(), canonicalize=True),
-                function=self.name,
-                module=None,  # TODO: support a top-level key for module name
-                cls=None,  # TODO: support test groupings
-            )
-            workflow_data = DataManager(data_resolver, data_dirs)
-        else:
-            workflow_data = self._fixture_request.getfixturevalue("workflow_data")
-
-        # Build the arguments to workflow_runner
-        workflow_runner_kwargs = self._workflow_runner_kwargs
-
-        # Resolve test data requests in the inputs and outputs
-
-        if self._inputs:
-            workflow_runner_kwargs["inputs"] = _resolve_test_data(
-                self._inputs, workflow_data
+        data_resolver = None
+        try:
+            # Get/create DataManager
+            if self._data:
+                config = self._fixture_request.getfixturevalue("user_config")
+                data_resolver = DataResolver(self._data, config)
+                data_dirs = DataDirs(
+                    ensure_path(
+                        self._fixture_request.fspath.dirpath(), canonicalize=True
+                    ),
+                    function=self.name,
+                    module=None,  # TODO: support a top-level key for module name
+                    cls=None,  # TODO: support test groupings
+                )
+                workflow_data = DataManager(data_resolver, data_dirs)
+            else:
+                workflow_data = self._fixture_request.getfixturevalue(
+                    "workflow_data"
+                )
+
+            # Build the arguments to workflow_runner
+            workflow_runner_kwargs = self._workflow_runner_kwargs
+
+            # Resolve test data requests in the inputs and outputs
+
+            if self._inputs:
+                workflow_runner_kwargs["inputs"] = _resolve_test_data(
+                    self._inputs, workflow_data
+                )
+
+            if self._expected:
+                workflow_runner_kwargs["expected"] = _resolve_test_data(
+                    self._expected, workflow_data
+                )
+
+            # Run the test
+            workflow_runner = self._fixture_request.getfixturevalue(
+                "workflow_runner"
             )
 
-        if self._expected:
-            workflow_runner_kwargs["expected"] = _resolve_test_data(
-                self._expected, workflow_data
-            )
-
-        # Run the test
-        workflow_runner = self._fixture_request.getfixturevalue("workflow_runner")
-
-        return workflow_runner(self._wdl, **workflow_runner_kwargs)
+            return workflow_runner(self._wdl, **workflow_runner_kwargs)
+        finally:
+            # Stop any downloads of the test data that are still running
+            if data_resolver:
+                data_resolver.close()
 
 
 def _resolve_test_data(d: dict, workflow_data: DataManager) -> dict:
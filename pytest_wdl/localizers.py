@@ -12,19 +12,47 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 from abc import ABCMeta, abstractmethod
-import json
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
 from pathlib import Path
+import shutil
+import tempfile
 from typing import Optional, cast
-from urllib import request
-
-from xphyle import open_
+from urllib import parse, request
+from urllib.error import HTTPError
 
 from pytest_wdl.config import UserConfiguration
-from pytest_wdl.url_schemes import Response, ResponseWrapper
+from pytest_wdl.url_schemes import (
+    CONTENT_RANGE_RE,
+    DOWNLOAD_BLOCK_SIZE,
+    BaseResponse,
+    Response,
+    ResponseWrapper,
+    partial_download_path,
+    partial_download_validator_path,
+    strong_validator,
+)
 from pytest_wdl.utils import (
-    LOG, DigestsNotEqualError, env_map, resolve_value_descriptor, verify_digests
+    LOG, DigestsNotEqualError, env_map, file_lock, resolve_value_descriptor,
+    verify_digests, write_json
 )
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:  # pragma: no-cover
+    LOG.debug(
+        "requests is not installed; a new connection will be opened for each "
+        "file downloaded over HTTP(S)"
+    )
+    requests = None
+
+
+_SESSION = None
+# Files smaller than this are not worth splitting into parallel range requests
+PARALLEL_DOWNLOAD_MIN_SIZE = 64 * 1024 * 1024
+
 
 class Localizer(metaclass=ABCMeta):  # pragma: no-cover
     """
@@ -84,6 +112,66 @@ class UrlLocalizer(Localizer):
         return True
 
     def localize(self, destination: Path):
+        download_cache_dir = self.user_config.download_cache_dir
+        if download_cache_dir:
+            cached = self._localize_cached(download_cache_dir)
+            # Copy rather than link the cached file, so that a test that modifies
+            # the localized file cannot corrupt the cache. The copy is made under a
+            # temporary name so that a concurrent worker never sees a partial file.
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=f".{destination.name}.", dir=destination.parent
+            )
+            os.close(fd)
+            shutil.copyfile(cached, tmp_path)
+            os.replace(tmp_path, destination)
+        else:
+            # The file may be downloaded to the same destination by concurrent
+            # processes (e.g. pytest-xdist workers) or threads
+            with file_lock(destination):
+                # Another worker may have downloaded the file while we were
+                # waiting for the lock
+                if not destination.exists():
+                    self._download(destination)
+
+    def _localize_cached(self, download_cache_dir: Path) -> Path:
+        """
+        Localizes the file to a download cache that persists between test sessions.
+        Files are keyed by URL, and a cached file is re-downloaded if the server
+        reports a different ETag than the one it had when the file was downloaded.
+        If the file has digests, a cached file that matches them is used without
+        contacting the server.
+
+        Returns:
+            Path to the cached file.
+        """
+        key = hashlib.sha1(self.url.encode()).hexdigest()
+        cached = download_cache_dir / key
+        etag_file = download_cache_dir / f"{key}.etag"
+
+        # The cache may be shared by concurrent test sessions or xdist workers
+        with file_lock(cached):
+            if self.digests and self.verify(cached):
+                LOG.debug("Using cached download of %s: %s", self.url, str(cached))
+                return cached
+
+            etag = get_etag(self.url, self.http_headers, self.user_config.proxies)
+
+            if self.verify(cached) and (
+                etag is None or (etag_file.exists() and etag_file.read_text() == etag)
+            ):
+                LOG.debug("Using cached download of %s: %s", self.url, str(cached))
+                return cached
+
+            self._download(cached)
+
+            if etag:
+                etag_file.write_text(etag)
+            elif etag_file.exists():
+                etag_file.unlink()
+
+        return cached
+
+    def _download(self, destination: Path):
         try:
             download_file(
                 self.url,
@@ -91,7 +179,8 @@ class UrlLocalizer(Localizer):
                 http_headers=self.http_headers,
                 proxies=self.user_config.proxies,
                 show_progress=self.user_config.show_progress,
-                digests=self.digests
+                digests=self.digests,
+                max_workers=self.user_config.download_workers
             )
         except Exception as err:
             # Delete the destination since it might be incomplete
@@ -138,6 +227,8 @@ class StringLocalizer(Localizer):
         self.contents = contents
 
     def localize(self, destination: Path):
+        from xphyle import open_
+
         LOG.debug(f"Persisting {destination} from contents")
         with open_(destination, "wt") as out:
             out.write(self.contents)
@@ -149,8 +240,7 @@ class JsonLocalizer(Localizer):
 
     def localize(self, destination: Path):
         LOG.debug(f"Persisting {destination} from contents")
-        with open(destination, "wt") as out:
-            json.dump(self.contents, out)
+        write_json(self.contents, destination)
 
 
 class LinkLocalizer(Localizer):
@@ -170,9 +260,174 @@ def download_file(
     http_headers: Optional[dict] = None,
     proxies: Optional[dict] = None,
     show_progress: bool = True,
-    digests: Optional[dict] = None
+    digests: Optional[dict] = None,
+    max_workers: int = 1
 ):
-    req = request.Request(url)
+    is_http = parse.urlparse(url).scheme in ("http", "https")
+
+    # Resume a previously interrupted download
+    partial = partial_download_path(destination)
+    validator_path = partial_download_validator_path(destination)
+    resume_from = 0
+    validator = None
+    if partial.exists():
+        if validator_path.exists():
+            validator = validator_path.read_text()
+        # Without a validator, an HTTP server cannot check that the file has not
+        # changed since the partial download started, so start over
+        if validator or not is_http:
+            resume_from = partial.stat().st_size
+
+    if requests and is_http:
+        if (
+            max_workers > 1
+            and not resume_from
+            and hasattr(os, "pwrite")
+            and _download_ranges(
+                url, destination, http_headers, proxies, max_workers, digests
+            )
+        ):
+            return
+        open_url = _open_url_with_session
+    else:
+        open_url = _open_url
+
+    downloader = open_url(url, http_headers, proxies, resume_from, validator)
+    if downloader is None:
+        # The range is not satisfiable, so start over
+        partial.unlink()
+        downloader = open_url(url, http_headers, proxies, 0, None)
+
+    LOG.debug("Downloading url %s to %s", url, str(destination))
+    downloader.download_file(destination, show_progress, digests)
+
+
+def _download_ranges(
+    url: str,
+    destination: Path,
+    http_headers: Optional[dict],
+    proxies: Optional[dict],
+    max_workers: int,
+    digests: Optional[dict]
+) -> bool:
+    """
+    Downloads a large file by requesting byte ranges of it concurrently, each of
+    which is written at its offset in the destination file.
+
+    Returns:
+        False if the file is too small to be worth splitting or the server does not
+        support range requests, in which case nothing is downloaded, otherwise True.
+    """
+    with _session_request("HEAD", url, http_headers, proxies, {}) as rsp:
+        if not rsp.ok or rsp.headers.get("accept-ranges") != "bytes":
+            return False
+        size_str = rsp.headers.get("content-length")
+        total_size = int(size_str) if size_str else 0
+
+    if total_size < PARALLEL_DOWNLOAD_MIN_SIZE:
+        return False
+
+    range_size = -(-total_size // max_workers)
+    ranges = [
+        (start, min(start + range_size, total_size))
+        for start in range(0, total_size, range_size)
+    ]
+
+    LOG.debug(
+        "Downloading url %s to %s in %d parallel ranges",
+        url, str(destination), len(ranges)
+    )
+
+    partial = partial_download_path(destination)
+
+    def download_range(fd: int, start: int, end: int):
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        with _session_request("GET", url, http_headers, proxies, headers) as rsp:
+            rsp.raise_for_status()
+            match = CONTENT_RANGE_RE.match(rsp.headers.get("content-range", ""))
+            if rsp.status_code != 206 or not match or int(match.group(1)) != start:
+                raise AssertionError(
+                    f"Server did not return the requested range {start}-{end - 1} "
+                    f"of {url}"
+                )
+            offset = start
+            while offset < end:
+                buf = rsp.raw.read(min(DOWNLOAD_BLOCK_SIZE, end - offset))
+                if not buf:
+                    break
+                os.pwrite(fd, buf, offset)
+                offset += len(buf)
+            if offset != end:
+                raise AssertionError(
+                    f"Received {offset - start} bytes of range {start}-{end - 1} of "
+                    f"{url}; expected {end - start}"
+                )
+
+    try:
+        with open(partial, "wb") as out:
+            out.truncate(total_size)
+            fd = out.fileno()
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [
+                    executor.submit(download_range, fd, start, end)
+                    for start, end in ranges
+                ]
+                for future in futures:
+                    future.result()
+    except Exception:
+        # The partial file has holes, so it cannot be used to resume the download
+        partial.unlink()
+        raise
+
+    os.replace(partial, destination)
+
+    if digests:
+        verify_digests(destination, digests)
+
+    return True
+
+
+def get_etag(
+    url: str,
+    http_headers: Optional[dict] = None,
+    proxies: Optional[dict] = None
+) -> Optional[str]:
+    """
+    Requests the headers of an HTTP(S) URL to get its ETag.
+
+    Args:
+        url: The URL.
+        http_headers: Headers to add to the request.
+        proxies: Proxies to use.
+
+    Returns:
+        The ETag, or None if the URL does not use HTTP(S), the server does not
+        provide an ETag, or the request fails.
+    """
+    if parse.urlparse(url).scheme not in ("http", "https"):
+        return None
+
+    try:
+        if requests:
+            with _session_request("HEAD", url, http_headers, proxies, {}) as rsp:
+                rsp.raise_for_status()
+                return rsp.headers.get("etag")
+        else:
+            req = _create_request(url, http_headers, proxies, method="HEAD")
+            with request.urlopen(req) as rsp:
+                return rsp.getheader("etag")
+    except Exception:
+        LOG.debug("Error getting the ETag of %s", url, exc_info=True)
+        return None
+
+
+def _create_request(
+    url: str,
+    http_headers: Optional[dict],
+    proxies: Optional[dict],
+    method: Optional[str] = None
+) -> request.Request:
+    req = request.Request(url, method=method)
     if http_headers:
         for name, value in http_headers.items():
             req.add_unredirected_header(name, value)
@@ -181,14 +436,138 @@ def download_file(
         #  Should we raise an exception if there is not a proxy defined for
         #  the URL scheme?
         # parsed = parse.urlparse(url)
-        for proxy_type, url in proxies.items():
-            req.set_proxy(url, proxy_type)
-    rsp = request.urlopen(req)
+        for proxy_type, proxy_url in proxies.items():
+            req.set_proxy(proxy_url, proxy_type)
+    return req
+
+
+def _open_url(
+    url: str,
+    http_headers: Optional[dict],
+    proxies: Optional[dict],
+    resume_from: int,
+    validator: Optional[str] = None
+) -> Optional[Response]:
+    req = _create_request(url, http_headers, proxies)
+    if resume_from:
+        LOG.debug("Resuming download of %s at byte %d", url, resume_from)
+        req.add_header("Range", f"bytes={resume_from}-")
+        if validator:
+            # The server sends the whole file rather than the range if it has changed
+            req.add_header("If-Range", validator)
+
+    try:
+        rsp = request.urlopen(req)
+    except HTTPError as err:
+        if err.code == 416 and resume_from:
+            return None
+        raise
 
     if isinstance(rsp, Response):
-        downloader = cast(Response, rsp)
+        return cast(Response, rsp)
     else:
-        downloader = ResponseWrapper(rsp)
+        return ResponseWrapper(rsp)
 
-    LOG.debug("Downloading url %s to %s", url, str(destination))
-    downloader.download_file(destination, show_progress, digests)
+
+def _open_url_with_session(
+    url: str,
+    http_headers: Optional[dict],
+    proxies: Optional[dict],
+    resume_from: int,
+    validator: Optional[str] = None
+) -> Optional[Response]:
+    range_headers = {}
+    if resume_from:
+        LOG.debug("Resuming download of %s at byte %d", url, resume_from)
+        range_headers["Range"] = f"bytes={resume_from}-"
+        if validator:
+            # The server sends the whole file rather than the range if it has changed
+            range_headers["If-Range"] = validator
+
+    rsp = _session_request("GET", url, http_headers, proxies, range_headers)
+
+    if rsp.status_code == 416 and resume_from:
+        rsp.close()
+        return None
+    rsp.raise_for_status()
+
+    return SessionResponseWrapper(rsp)
+
+
+def _session_request(
+    method: str,
+    url: str,
+    http_headers: Optional[dict],
+    proxies: Optional[dict],
+    headers: dict
+) -> "requests.Response":
+    session = _get_session()
+    # Only add the HTTP headers to the initial request and not to redirects
+    rsp = session.request(
+        method,
+        url,
+        headers={**(http_headers or {}), **headers},
+        proxies=proxies,
+        stream=True,
+        allow_redirects=False
+    )
+    if rsp.is_redirect:
+        location = parse.urljoin(rsp.url, rsp.headers["location"])
+        rsp.close()
+        rsp = session.request(
+            method, location, headers=headers, proxies=proxies, stream=True
+        )
+    return rsp
+
+
+def _get_session() -> "requests.Session":
+    """
+    Returns a session that is shared by all downloads, so that connections to the
+    same host are reused.
+    """
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # The Content-Length header is used to validate the downloaded file, so
+        # request the content as-is rather than compressed
+        session.headers["Accept-Encoding"] = "identity"
+        _SESSION = session
+    return _SESSION
+
+
+class SessionResponseWrapper(BaseResponse):
+    def __init__(self, rsp: "requests.Response"):
+        self.rsp = rsp
+
+    def get_content_length(self) -> Optional[int]:
+        size_str = self.rsp.headers.get("content-length")
+        if size_str:
+            return int(size_str)
+
+    def get_start_offset(self) -> int:
+        if self.rsp.status_code == 206:
+            match = CONTENT_RANGE_RE.match(self.rsp.headers.get("content-range", ""))
+            if match:
+                return int(match.group(1))
+        return 0
+
+    def get_validator(self) -> Optional[str]:
+        return strong_validator(
+            self.rsp.headers.get("etag"), self.rsp.headers.get("last-modified")
+        )
+
+    def read(self, block_size: int) -> bytes:
+        return self.rsp.raw.read(block_size)
+
+    def download_file(
+        self,
+        destination: Path,
+        show_progress: bool = False,
+        digests: Optional[dict] = None
+    ):
+        # Release the connection back to the pool once the download is complete
+        with self.rsp:
+            super().download_file(destination, show_progress, digests)
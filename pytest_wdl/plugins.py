@@ -1,15 +1,22 @@
 from collections import defaultdict
-import logging
-import os
+import re
+import sys
 from typing import (
-    Dict, Generic, Iterable, Optional, Type, TypeVar, cast
+    Any, Dict, Generic, Iterable, Optional, Type, TypeVar, cast
 )
 
-from pkg_resources import EntryPoint, ResolutionError, iter_entry_points
+from pytest_wdl.utils import LOG
 
+# Selecting entry points by group, and getting the distribution that provides an
+# entry point, require Python 3.10+. Older versions fall back to pkg_resources,
+# which is slow to import because it scans all installed distributions.
+if sys.version_info >= (3, 10):
+    from importlib import metadata
+    pkg_resources = None
+else:  # pragma: no-cover
+    metadata = None
+    import pkg_resources
 
-LOG = logging.getLogger("pytest-wdl")
-LOG.setLevel(os.environ.get("LOGLEVEL", "WARNING").upper())
 
 T = TypeVar("T")
 
@@ -18,27 +25,106 @@ class PluginError(Exception):
     pass
 
 
+class MissingDependencyError(PluginError):
+    pass
+
+
+EXTRA_MARKER_RE = re.compile(r"""extra\s*==\s*["']([^"']+)["']""")
+REQUIREMENT_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+class MetadataEntryPoint:
+    """
+    Wraps an `importlib.metadata` entry point to provide the subset of the
+    `pkg_resources.EntryPoint` interface used to load plugins.
+    """
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+        self.name = entry_point.name
+        self.module_name = entry_point.module
+
+    def resolve(self) -> Any:
+        return self.entry_point.load()
+
+    def require(self):
+        """
+        Checks that the distributions required by the entry point's extras are
+        installed.
+
+        Raises:
+            MissingDependencyError if a required distribution is not installed.
+        """
+        extras = self.entry_point.extras
+        dist = self.entry_point.dist
+        if not (extras and dist):
+            return
+
+        for requirement in dist.requires or ():
+            spec, _, marker = requirement.partition(";")
+            extra = EXTRA_MARKER_RE.search(marker)
+            if not (extra and extra.group(1) in extras):
+                continue
+            name = REQUIREMENT_NAME_RE.match(spec.strip()).group(0)
+            try:
+                metadata.distribution(name)
+            except metadata.PackageNotFoundError:
+                raise MissingDependencyError(
+                    f"{name} is required by extra {extra.group(1)}"
+                )
+
+
+def iter_entry_points(group: str) -> Iterable:
+    """
+    Iterates over the entry points in a group.
+
+    Args:
+        group: Entry point group name
+
+    Returns:
+        Iterable of entry points
+    """
+    if metadata is None:  # pragma: no-cover
+        return pkg_resources.iter_entry_points(group=group)
+    return [
+        MetadataEntryPoint(entry_point)
+        for entry_point in metadata.entry_points(group=group)
+    ]
+
+
 class PluginFactory(Generic[T]):
     """
     Lazily loads a plugin class associated with a data type.
     """
-    def __init__(self, entry_point: EntryPoint, return_type: Type[T]):
+    def __init__(self, entry_point, return_type: Type[T]):
         self.entry_point = entry_point
         self.return_type = return_type
         self.factory = None
+        self._check_instances = True
 
     def __call__(self, *args, **kwargs) -> T:
         if self.factory is None:
             try:
-                self.factory = self.entry_point.resolve()
+                factory = self.entry_point.resolve()
             except ImportError as err:
                 raise PluginError(
                     f"Could not load plugin {self.entry_point.name}"
                 ) from err
 
+            # If the entry point is a class, its type can be validated once here
+            # rather than checking every instance it creates.
+            if isinstance(factory, type):
+                if not issubclass(factory, self.return_type):
+                    raise RuntimeError(
+                        f"Expected plugin {factory} to be a subclass of "
+                        f"{self.return_type}"
+                    )
+                self._check_instances = False
+
+            self.factory = factory
+
         plugin = self.factory(*args, **kwargs)
 
-        if not isinstance(plugin, self.return_type):  # TODO: test this
+        if self._check_instances and not isinstance(plugin, self.return_type):
             raise RuntimeError(
                 f"Expected plugin {plugin} to be an instance of {self.return_type}"
             )
@@ -46,10 +132,15 @@ class PluginFactory(Generic[T]):
         return cast(self.return_type, plugin)
 
 
+MISSING_DEPENDENCY_ERRORS = (MissingDependencyError,) + (
+    (pkg_resources.ResolutionError,) if pkg_resources else ()
+)
+
+
 def plugin_factory_map(
     return_type: Type[T],
     group: Optional[str] = None,
-    entry_points: Optional[Iterable[EntryPoint]] = None
+    entry_points: Optional[Iterable] = None
 ) -> Dict[str, PluginFactory[T]]:
     """
     Creates a mapping of entry point name to `PluginFactory` for all discovered
@@ -95,7 +186,7 @@ def plugin_factory_map(
                 "dependency: %s", name, str(rerr)
             )
             continue
-        except ResolutionError as rerr:
+        except MISSING_DEPENDENCY_ERRORS as rerr:
             LOG.warning(
                 "Plugin %s is not available because it is missing an extra "
                 "dependency: %s", name, str(rerr)
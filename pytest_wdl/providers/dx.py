@@ -27,6 +27,7 @@ from pytest_wdl.executors import (
     ExecutorError,
     ExecutionFailedError,
     JavaExecutor,
+    PRIMITIVE_TYPES,
     parse_wdl,
 )
 from pytest_wdl.localizers import UrlLocalizer
@@ -359,7 +360,9 @@ class DxWdlExecutor(JavaExecutor):
             LOG.info(f"Building workflow with command '{cmd}'")
 
             try:
-                workflow_id = subby.sub(cmd).splitlines(False)[-1]
+                workflow_id = subby.sub(
+                    cmd, cwd=kwargs.get("execution_dir")
+                ).splitlines(False)[-1]
             except subby.core.CalledProcessError as perr:
                 raise ExecutorError(
                     "dxwdl",
@@ -522,6 +525,9 @@ class DxInputsFormatter:
             The tuple `(val, is_complex)`, where `val` is serializable value and
             `is_complex` is True if the value is a complex type.
         """
+        if type(value) in PRIMITIVE_TYPES:
+            return value, False
+
         if hasattr(value, "as_dict"):
             return value.as_dict(), True
 
@@ -15,13 +15,13 @@
 from abc import ABCMeta, abstractmethod
 from enum import Enum
 import functools
+import os
 from pathlib import Path
+import re
 from typing import Optional, Sequence
 from urllib.request import BaseHandler, Request, build_opener, install_opener
 
-from pkg_resources import iter_entry_points
-
-from pytest_wdl.plugins import PluginError, PluginFactory
+from pytest_wdl.plugins import PluginError, PluginFactory, iter_entry_points
 from pytest_wdl.utils import LOG, verify_digests
 
 try:
@@ -34,6 +34,10 @@ except ImportError:  # pragma: no-cover
     progress = None
 
 
+DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-")
+
+
 class Method(Enum):
     OPEN = ("urlopen", "{}_open")
     REQUEST = ("request", "{}_request")
@@ -72,6 +76,21 @@ class BaseResponse(Response, metaclass=ABCMeta):
     def get_content_length(self) -> Optional[int]:
         pass
 
+    def get_start_offset(self) -> int:
+        """
+        Returns the offset of the first byte of the response content within the
+        file, which is non-zero when a partial download is being resumed.
+        """
+        return 0
+
+    def get_validator(self) -> Optional[str]:
+        """
+        Returns the strong ETag of the file, or its Last-Modified date if it does
+        not have one, which is sent in the `If-Range` header when an interrupted
+        download of the file is resumed.
+        """
+        return None
+
     @abstractmethod
     def read(self, block_size: int):
         pass
@@ -82,14 +101,43 @@ class BaseResponse(Response, metaclass=ABCMeta):
         show_progress: bool = False,
         digests: Optional[dict] = None
     ):
+        # Download to a temporary file so that an interrupted download can be
+        # resumed, and is never mistaken for a complete file
+        partial = partial_download_path(destination)
+        validator_path = partial_download_validator_path(destination)
+        offset = self.get_start_offset()
+        if offset:
+            partial_size = partial.stat().st_size if partial.exists() else 0
+            if partial_size < offset:
+                raise AssertionError(
+                    f"Cannot resume download to {destination} at byte {offset}; "
+                    f"only {partial_size} bytes were previously downloaded"
+                )
+        else:
+            if partial.exists():
+                # The server sent the whole file, e.g. because it has changed since
+                # the partial download started, so the partial download is stale
+                LOG.debug("Discarding partial download %s", str(partial))
+                partial.unlink()
+            # Record the version of the file being downloaded so that the download
+            # can only be resumed if the file does not change
+            validator = self.get_validator()
+            if validator:
+                validator_path.write_text(validator)
+            elif validator_path.exists():
+                validator_path.unlink()
+
         total_size = self.get_content_length()
-        block_size = 16 * 1024
+        if total_size is not None:
+            total_size += offset
+        block_size = DOWNLOAD_BLOCK_SIZE
         if total_size and total_size < block_size:
             block_size = total_size
 
         if show_progress and progress:
             progress_bar = progress(
                 total=total_size,
+                initial=offset,
                 unit="b",
                 unit_scale=True,
                 unit_divisor=1024,
@@ -99,7 +147,7 @@ class BaseResponse(Response, metaclass=ABCMeta):
             def progress_reader():
                 b = self.read(block_size)
                 if b:
-                    progress_bar.update(block_size)
+                    progress_bar.update(len(b))
                 else:
                     progress_bar.close()
                 return b
@@ -108,9 +156,12 @@ class BaseResponse(Response, metaclass=ABCMeta):
         else:
             reader = functools.partial(self.read, block_size)
 
-        downloaded_size = 0
+        downloaded_size = offset
 
-        with open(destination, "wb") as out:
+        with open(partial, "r+b" if offset else "wb") as out:
+            if offset:
+                out.seek(offset)
+                out.truncate()
             while True:
                 buf = reader()
                 if not buf:
@@ -118,12 +169,16 @@ class BaseResponse(Response, metaclass=ABCMeta):
                 downloaded_size += len(buf)
                 out.write(buf)
 
-        if downloaded_size != total_size:  # TODO: test this
+        if total_size is not None and downloaded_size != total_size:
             raise AssertionError(
                 f"Size of downloaded file {destination} does not match expected size "
                 f"{total_size}"
             )
 
+        os.replace(partial, destination)
+        if validator_path.exists():
+            validator_path.unlink()
+
         if digests:
             verify_digests(destination, digests)
 
@@ -137,10 +192,49 @@ class ResponseWrapper(BaseResponse):
         if size_str:
             return int(size_str)
 
+    def get_start_offset(self) -> int:
+        if getattr(self.rsp, "status", None) == 206:
+            match = CONTENT_RANGE_RE.match(self.rsp.getheader("content-range", ""))
+            if match:
+                return int(match.group(1))
+        return 0
+
+    def get_validator(self) -> Optional[str]:
+        return strong_validator(
+            self.rsp.getheader("etag"), self.rsp.getheader("last-modified")
+        )
+
     def read(self, block_size: int) -> bytes:
         return self.rsp.read(block_size)
 
 
+def partial_download_path(destination: Path) -> Path:
+    """
+    Returns the path to which `destination` is downloaded before it is complete.
+    """
+    return destination.with_name(f"{destination.name}.part")
+
+
+def partial_download_validator_path(destination: Path) -> Path:
+    """
+    Returns the path to which the validator (see `BaseResponse.get_validator`) of
+    the partial download of `destination` is written.
+    """
+    return destination.with_name(f"{destination.name}.part.validator")
+
+
+def strong_validator(
+    etag: Optional[str], last_modified: Optional[str]
+) -> Optional[str]:
+    """
+    Returns `etag` if it is a strong ETag, otherwise `last_modified`. Weak ETags
+    cannot be used in an `If-Range` header.
+    """
+    if etag and not etag.startswith("W/"):
+        return etag
+    return last_modified
+
+
 class UrlHandler(BaseHandler, metaclass=ABCMeta):
     @property
     @abstractmethod
@@ -15,9 +15,13 @@
 #    limitations under the License.
 #
 # TODO: some of the code here can be replaced by functions in xphyle.{paths,utils}
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 import contextlib
 import fnmatch
+import functools
 import hashlib
+import json
 import logging
 import os
 from pathlib import Path
@@ -25,11 +29,27 @@ import re
 import shutil
 import stat
 import tempfile
+import threading
 import time
-from typing import Callable, Optional, Sequence, Union, cast
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
 
 from py._path.local import LocalPath
 
+try:
+    import fcntl
+except ImportError:  # pragma: no-cover
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no-cover
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # pragma: no-cover
+    xxhash = None
+
 
 LOG = logging.getLogger("pytest-wdl")
 LOG.setLevel(os.environ.get("LOGLEVEL", "WARNING").upper())
@@ -39,6 +59,28 @@ ENV_CLASSPATH = "CLASSPATH"
 DEFAULT_CLASSPATH = "."
 
 UNSAFE_RE = re.compile(r"[^\w.-]")
+GLOB_MAGIC_RE = re.compile(r"[*?[]")
+HASH_BLOCK_SIZE = 1024 * 1024
+# Number of lock files used by file_lock
+LOCK_FILE_COUNT = 64
+# Hash used to test files for equality; xxh3_128 is much faster than the hashlib
+# algorithms but requires the optional xxhash library
+COMPARE_HASH_NAME = "xxh3_128" if xxhash else "blake2b"
+# Maps (path, hash name) to the (inode, size, mtime, ctime) of the file when it
+# was hashed and the digest; the least recently used entries are evicted once the
+# cache holds DIGESTS_CACHE_SIZE entries. Files are hashed from several threads,
+# so the cache is guarded by a lock.
+DIGESTS_CACHE_SIZE = 1024
+_DIGESTS: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int, int, int], bytes]]" = \
+    OrderedDict()
+_DIGESTS_LOCK = threading.Lock()
+# Maps (start directory, filenames) to the (directory, file) found by
+# find_project_path; the least recently used entries are evicted once the cache
+# holds PROJECT_PATHS_CACHE_SIZE entries
+PROJECT_PATHS_CACHE_SIZE = 256
+_PROJECT_PATHS: "OrderedDict[Tuple[str, tuple], Tuple[Path, Path]]" = OrderedDict()
+# Maps (executable, search path) to the executable found by find_executable_path
+_EXECUTABLE_PATHS: Dict[Tuple[str, str], Path] = {}
 
 
 def safe_string(s: str, replacement: str = "_") -> str:
@@ -148,6 +190,49 @@ def context_dir(
             shutil.rmtree(path, ignore_errors=True)
 
 
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """
+    Context manager that holds an exclusive lock on a file while the context is
+    active. Used to keep concurrent processes (e.g. pytest-xdist workers) and
+    threads from downloading the same file at the same time. The lock is a no-op
+    on platforms that do not provide `fcntl`.
+
+    Locks are held on one of `LOCK_FILE_COUNT` files in a dedicated lock
+    directory, chosen by the hash of `path`, so nothing is written next to `path`
+    and the number of lock files is bounded. Paths that share a lock file are
+    simply not localized concurrently. Locks are not reentrant, so a second lock
+    must not be taken while one is held.
+
+    Args:
+        path: Path of the file to lock.
+    """
+    if fcntl is None:  # pragma: no-cover
+        yield
+        return
+
+    digest = hashlib.sha1(os.path.abspath(path).encode()).digest()
+    slot = int.from_bytes(digest[:4], "big") % LOCK_FILE_COUNT
+
+    with open(_get_lock_dir() / f"{slot}.lock", "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+@functools.lru_cache(1)
+def _get_lock_dir() -> Path:
+    """
+    Get the directory that holds lock files. It is shared by all test sessions
+    of the same user so that concurrent sessions lock the same files.
+    """
+    lock_dir = Path(tempfile.gettempdir()) / f"pytest_wdl_locks_{os.getuid()}"
+    lock_dir.mkdir(exist_ok=True)
+    return lock_dir
+
+
 def ensure_path(
     path: Union[str, LocalPath, Path],
     search_paths: Optional[Sequence[Path]] = None,
@@ -180,27 +265,32 @@ def ensure_path(
     Returns:
         A `pathlib.Path` object.
     """
-    if isinstance(path, Path):
-        p = cast(Path, path)
-    else:
-        p = Path(str(path))
-
-    p = Path(os.path.expandvars(p))
+    # Work with the path as a string until it is canonicalized, which avoids
+    # creating several intermediate Path objects
+    path_str = os.path.expandvars(
+        os.fspath(path) if isinstance(path, Path) else str(path)
+    )
 
     if canonicalize:
-        p = p.expanduser()
+        path_str = os.path.expanduser(path_str)
 
-        if search_paths and not p.is_absolute():
+        if search_paths and not os.path.isabs(path_str):
             if exists:
                 for search_path in search_paths:
-                    p_tmp = search_path / p
-                    if p_tmp.exists():
-                        p = p_tmp.absolute()
+                    candidate = os.path.join(search_path, path_str)
+                    if os.path.exists(candidate):
+                        path_str = candidate
                         break
             else:
-                p = (search_paths[0] / p).absolute()
+                path_str = os.path.join(search_paths[0], path_str)
+
+        path_str = os.path.realpath(path_str)
+
+    p = Path(path_str)
 
-        p = p.resolve()
+    if exists is None and is_file is None and not create:
+        # Nothing to check, so don't stat the path
+        return p
 
     if p.exists():
         if exists is False:
@@ -292,31 +382,71 @@ def find_project_path(
         FileNotFoundError if the file cannot be found and `assert_exists` is True.
     """
     path = start or Path.cwd()
-    while path != path.parent:
+    filenames = tuple(
+        f if isinstance(f, (str, Path)) else Path(*f) for f in filenames
+    )
+    # Project files rarely move during a session, so the folders above a previous
+    # result do not need to be searched again
+    key = (os.path.abspath(path), filenames)
+    cached = _PROJECT_PATHS.get(key)
+    if cached and cached[1].exists():
+        # A file may have been created in a folder closer to `start`
+        parent, found = _find_project_path(path, filenames, stop=cached[0])
+        if not found:
+            parent, found = cached
+    else:
+        parent, found = _find_project_path(path, filenames)
+
+    if found:
+        _PROJECT_PATHS[key] = (parent, found)
+        _PROJECT_PATHS.move_to_end(key)
+        if len(_PROJECT_PATHS) > PROJECT_PATHS_CACHE_SIZE:
+            _PROJECT_PATHS.popitem(last=False)
+        return parent if return_parent else found
+
+    _PROJECT_PATHS.pop(key, None)
+
+    if assert_exists:
+        raise FileNotFoundError(
+            f"Could not find any of {','.join(str(f) for f in filenames)} "
+            f"starting from {start}"
+        )
+
+    return None
+
+
+def _find_project_path(
+    path: Path,
+    filenames: Tuple[Union[str, Path], ...],
+    stop: Optional[Path] = None,
+) -> Tuple[Optional[Path], Optional[Path]]:
+    while path != path.parent and path != stop:
         for filename in filenames:
-            if isinstance(filename, str):
-                found = list(path.glob(filename))
-                found = found[0] if found else None
+            if isinstance(filename, str) and GLOB_MAGIC_RE.search(filename):
+                found = next(path.glob(filename), None)
             else:
+                # A filename without wildcards can be checked directly
                 found = path / filename
                 if not found.exists():
                     found = None
             if found:
                 LOG.debug("Found %s in %s", filename, path)
-                if return_parent:
-                    return path
-                else:
-                    return found
+                return path, found
         else:
             path = path.parent
 
-    if assert_exists:
-        raise FileNotFoundError(
-            f"Could not find any of {','.join(str(f) for f in filenames)} "
-            f"starting from {start}"
-        )
+    return None, None
 
-    return None
+
+def clear_path_caches():
+    """
+    Clears the results cached by `find_project_path` and `find_executable_path`,
+    and the cached file digests. Called at the end of each test session.
+    """
+    _PROJECT_PATHS.clear()
+    _EXECUTABLE_PATHS.clear()
+    with _DIGESTS_LOCK:
+        _DIGESTS.clear()
 
 
 def find_executable_path(
@@ -334,15 +464,24 @@ def find_executable_path(
     """
     if search_path is None:
         if ENV_PATH in os.environ:
-            search_path = [Path(p) for p in os.environ[ENV_PATH].split(os.pathsep)]
+            path_str = os.environ[ENV_PATH]
         else:
             return None
-    for path in search_path:
-        exe_path = path / executable
-        if exe_path.exists() and is_executable(exe_path):
-            return exe_path
     else:
+        path_str = os.pathsep.join(os.fspath(path) for path in search_path)
+
+    # An executable that was found before only needs to be checked, rather than
+    # searching the whole path again
+    key = (executable, path_str)
+    exe_path = _EXECUTABLE_PATHS.get(key)
+    if exe_path and is_executable(exe_path):
+        return exe_path
+
+    exe_path_str = shutil.which(executable, path=path_str)
+    if exe_path_str is None:
         return None
+    exe_path = _EXECUTABLE_PATHS[key] = Path(exe_path_str)
+    return exe_path
 
 
 def is_executable(path: Path) -> bool:
@@ -370,23 +509,34 @@ def find_in_classpath(glob: str) -> Optional[Path]:
         Path to the JAR file, or None if a matching file is not found.
     """
     classpath = os.environ.get(ENV_CLASSPATH, DEFAULT_CLASSPATH)
+    pattern = re.compile(fnmatch.translate(glob))
 
     for path_str in classpath.split(os.pathsep):
         path = ensure_path(path_str)
-        if path.exists():
-            if path.is_dir():
-                matches = list(path.glob(glob))
-                if matches:
-                    if len(matches) > 1:
-                        LOG.warning(
-                            "Found multiple jar files matching pattern %s: %s;"
-                            "returning the first one.",
-                            glob,
-                            matches,
-                        )
-                    return matches[0]
-            elif path.exists() and fnmatch.fnmatch(path.name, glob):
+        # List each directory once rather than checking whether the entry exists
+        # and is a directory before globbing it
+        try:
+            with os.scandir(path) as entries:
+                matches = [
+                    path / entry.name for entry in entries if pattern.match(entry.name)
+                ]
+        except NotADirectoryError:
+            if fnmatch.fnmatch(path.name, glob):
                 return path
+            continue
+        except OSError:
+            # Missing or unreadable (e.g. PermissionError) classpath entries are
+            # skipped, as the JVM does
+            continue
+        if matches:
+            if len(matches) > 1:
+                LOG.warning(
+                    "Found multiple jar files matching pattern %s: %s;"
+                    "returning the first one.",
+                    glob,
+                    matches,
+                )
+            return matches[0]
 
 
 def env_map(d: dict) -> dict:
@@ -394,12 +544,14 @@ def env_map(d: dict) -> dict:
     Given a mapping of keys to value descriptors, creates a mapping of the keys to
     the described values.
     """
-    envmap = {}
-    for name, value_descriptor in d.items():
-        value = resolve_value_descriptor(value_descriptor)
-        if value:
-            envmap[name] = value
-    return envmap
+    return {
+        name: value
+        for name, value in (
+            (name, resolve_value_descriptor(value_descriptor))
+            for name, value_descriptor in d.items()
+        )
+        if value
+    }
 
 
 def resolve_value_descriptor(value_descriptor: Union[str, dict]) -> Optional:
@@ -422,13 +574,124 @@ def resolve_value_descriptor(value_descriptor: Union[str, dict]) -> Optional:
         return value_descriptor.get("value")
 
 
+def read_json(path: Path) -> Any:
+    """
+    Reads a JSON file. Uses orjson if it is installed, which is considerably faster
+    than the built-in json module for large files.
+
+    Args:
+        path: The JSON file to read.
+
+    Returns:
+        The deserialized JSON object.
+    """
+    if orjson:
+        with open(path, "rb") as inp:
+            return orjson.loads(inp.read())
+    else:
+        with open(path, "rt") as inp:
+            return json.load(inp)
+
+
+def write_json(obj: Any, path: Path, default: Optional[Callable] = None) -> None:
+    """
+    Writes an object to a JSON file. Uses orjson if it is installed, falling back
+    to the built-in json module for objects that orjson cannot serialize (e.g.
+    integers larger than 64 bits).
+
+    Args:
+        obj: The object to write.
+        path: The JSON file to write.
+        default: Function that is called to serialize objects that are not
+            otherwise serializable.
+    """
+    if orjson:
+        try:
+            data = orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            LOG.debug("orjson could not serialize %s; falling back to json", path)
+        else:
+            with open(path, "wb") as out:
+                out.write(data)
+            return
+
+    # Serialize the object in one call rather than using json.dump, which writes
+    # each small piece of the output separately
+    data = json.dumps(obj, default=default, separators=(",", ":"))
+    with open(path, "wt") as out:
+        out.write(data)
+
+
+def dumps_json(obj: Any, default: Optional[Callable] = None) -> str:
+    """
+    Serializes an object to a JSON string. Uses orjson if it is installed, falling
+    back to the built-in json module for objects that orjson cannot serialize.
+
+    Args:
+        obj: The object to serialize.
+        default: Function that is called to serialize objects that are not
+            otherwise serializable.
+
+    Returns:
+        The JSON string.
+    """
+    if orjson:
+        try:
+            return orjson.dumps(
+                obj, default=default, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except orjson.JSONEncodeError:
+            LOG.debug("orjson could not serialize object; falling back to json")
+
+    return json.dumps(obj, default=default)
+
+
 class DigestsNotEqualError(AssertionError):
     pass
 
 
-def compare_files_with_hash(file1: Path, file2: Path, hash_name: str = "md5"):
-    file1_digest = hash_file(file1, hash_name)
-    file2_digest = hash_file(file2, hash_name)
+def compare_files_with_hash(
+    file1: Path, file2: Path, hash_name: str = COMPARE_HASH_NAME
+):
+    key1, stamp1, file1_digest = _get_cached_digest(file1, hash_name)
+    key2, stamp2, file2_digest = _get_cached_digest(file2, hash_name)
+
+    # Files of different sizes can never have the same contents, so don't bother
+    # reading them
+    if stamp1[1] != stamp2[1]:
+        raise DigestsNotEqualError(
+            f"Sizes differ between expected identical files {file1}, {file2}"
+        )
+
+    if file1_digest is None or file2_digest is None:
+        # Compare the files block-by-block, so that differing files are rejected
+        # as soon as the first difference is found. The blocks of identical files
+        # are equal, so only one of them needs to be hashed to get the digest of
+        # both files for later comparisons. File reads and hashing release the
+        # GIL, so each block of the second file is read, and each block is hashed,
+        # in worker threads while the main thread reads the first file.
+        hashobj = _new_hash(hash_name)
+        hashed = None
+        with ThreadPoolExecutor(max_workers=2) as executor, \
+                open(file1, "rb") as inp1, open(file2, "rb") as inp2:
+            while True:
+                block2 = executor.submit(inp2.read, HASH_BLOCK_SIZE)
+                block = inp1.read(HASH_BLOCK_SIZE)
+                if block != block2.result():
+                    raise DigestsNotEqualError(
+                        f"Contents differ between expected identical files "
+                        f"{file1}, {file2}"
+                    )
+                # Blocks must be hashed in order
+                if hashed:
+                    hashed.result()
+                if not block:
+                    break
+                hashed = executor.submit(hashobj.update, block)
+        file1_digest = file2_digest = hashobj.digest()
+        _set_cached_digest(key1, stamp1, file1_digest)
+        _set_cached_digest(key2, stamp2, file2_digest)
+
     if file1_digest != file2_digest:
         raise DigestsNotEqualError(
             f"{hash_name} digests differ between expected identical files "
@@ -436,18 +699,76 @@ def compare_files_with_hash(file1: Path, file2: Path, hash_name: str = "md5"):
         )
 
 
+def file_digest(path: Path, hash_name: str = "blake2b") -> bytes:
+    """
+    Computes the digest of a file. Digests are cached, so an unmodified file (e.g.
+    an expected output that is compared with several actual outputs) is only read
+    and hashed once.
+
+    Args:
+        path: The file to hash.
+        hash_name: Name of the hashlib (or xxhash, if it is installed) algorithm
+            to use.
+
+    Returns:
+        The digest as bytes.
+    """
+    key, stamp, digest = _get_cached_digest(path, hash_name)
+    if digest is None:
+        digest = _hash_file(path, hash_name).digest()
+        _set_cached_digest(key, stamp, digest)
+    return digest
+
+
+def _get_cached_digest(path: Path, hash_name: str):
+    st = os.stat(path)
+    key = (os.fspath(path), hash_name)
+    stamp = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+    with _DIGESTS_LOCK:
+        cached = _DIGESTS.get(key)
+        if cached and cached[0] == stamp:
+            _DIGESTS.move_to_end(key)
+            return key, stamp, cached[1]
+    return key, stamp, None
+
+
+def _set_cached_digest(key: Tuple[str, str], stamp: tuple, digest: bytes):
+    with _DIGESTS_LOCK:
+        _DIGESTS[key] = (stamp, digest)
+        _DIGESTS.move_to_end(key)
+        if len(_DIGESTS) > DIGESTS_CACHE_SIZE:
+            _DIGESTS.popitem(last=False)
+
+
 def hash_file(path: Path, hash_name: str = "md5") -> str:
+    return _hash_file(path, hash_name).hexdigest()
+
+
+def _new_hash(hash_name: str):
+    if xxhash and hash_name in xxhash.algorithms_available:
+        return getattr(xxhash, hash_name)()
     assert hash_name in hashlib.algorithms_guaranteed
-    with open(path, "rb") as inp:
-        hashobj = hashlib.new(hash_name)
-        hashobj.update(inp.read())
-        return hashobj.hexdigest()
+    return hashlib.new(hash_name)
+
+
+def _hash_file(path: Path, hash_name: str):
+    hashobj = _new_hash(hash_name)
+    # Hash the file in fixed-size blocks so that memory usage does not grow with
+    # the size of the file
+    with open(path, "rb", buffering=0) as inp:
+        if hasattr(hashlib, "file_digest"):  # python 3.11+
+            return hashlib.file_digest(inp, lambda: hashobj)
+        buf = bytearray(HASH_BLOCK_SIZE)
+        view = memoryview(buf)
+        for size in iter(functools.partial(inp.readinto, buf), 0):
+            hashobj.update(view[:size])
+    return hashobj
 
 
 def verify_digests(path: Path, digests: dict):
     for hash_name, expected_digest in digests.items():
         try:
-            actual_digest = hash_file(path, hash_name)
+            actual_digest = file_digest(path, hash_name).hex()
         except AssertionError:  # TODO: test this
             LOG.warning(
                 "Hash algorithm %s is not supported; cannot verify file %s",
@@ -7,7 +7,10 @@ extras_require = {
     "bam": ["pysam>=0.15.4"],
     "dx": ["dxpy>=0.303.1"],
     "http": ["requests<2.24.0"],
+    "isal": ["isal>=0.5"],
+    "json": ["orjson>=3.0"],
     "progress": ["tqdm"],
+    "xxhash": ["xxhash>=2.0"],
     "yaml": ["ruamel.yaml>=0.15.37"],
 }
 extras_require["all"] = list(
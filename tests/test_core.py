@@ -14,8 +14,9 @@
 
 import gzip
 import json
+import threading
 from typing import cast
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -39,6 +40,11 @@ def test_data_file():
             out.write("foo\nbar")
         df = DefaultDataFile(bar, LinkLocalizer(foo))
         assert str(df) == str(bar)
+        assert df.path == bar
+        # Once the file is localized, its existence is not checked again
+        with patch("pathlib.Path.exists") as exists:
+            assert df.path == bar
+            exists.assert_not_called()
 
         baz = d / "baz.txt"
         with open(baz, "wt") as out:
@@ -58,6 +64,25 @@ def test_data_file():
         df.compare_opts["allowed_diff_lines"] = 2
         df.assert_contents_equal(blorf)
 
+        # A file is equal to a link to itself without being compared
+        blorf_link = d / "blorf_link.txt"
+        blorf_link.symlink_to(blorf)
+        blorf_df = DefaultDataFile(blorf)
+        blorf_df._assert_contents_equal = Mock(side_effect=AssertionError)
+        blorf_df.assert_contents_equal(blorf_link)
+
+
+def test_data_file_missing():
+    with tempdir() as d:
+        foo = d / "foo.txt"
+        foo.write_text("foo")
+        df = DefaultDataFile(foo)
+        with pytest.raises(AssertionError, match="does not exist"):
+            df.assert_contents_equal(d / "bar.txt")
+        df.set_compare_opts(allowed_diff_lines=1)
+        with pytest.raises(AssertionError, match="does not exist"):
+            df.assert_contents_equal(d / "bar.txt")
+
 
 def test_data_file_gz():
     with tempdir() as d:
@@ -82,6 +107,21 @@ def test_data_file_gz():
         df.assert_contents_equal(bar)
         df.assert_contents_equal(str(bar))
         df.assert_contents_equal(DefaultDataFile(bar))
+        # The files are decompressed in memory rather than to temporary files
+        with patch("pytest_wdl.data_types.tempdir") as tempdir_mock:
+            df.assert_contents_equal(baz)
+            tempdir_mock.assert_not_called()
+
+        # Differing files have different gzip CRCs
+        df.set_compare_opts(allowed_diff_lines=0)
+        with pytest.raises(AssertionError):
+            df.assert_contents_equal(baz)
+
+        # A truncated file is not equal
+        truncated = d / "truncated.txt.gz"
+        truncated.write_bytes(b"\x1f\x8b")
+        with pytest.raises(AssertionError, match="not a valid gzip file"):
+            df.assert_contents_equal(truncated)
 
 
 def test_data_file_dict_type():
@@ -89,14 +129,16 @@ def test_data_file_dict_type():
         foo = d / "foo.txt.gz"
         with gzip.open(foo, "wt") as out:
             out.write("foo\nbar")
+        data_type = {
+            "name": "default",
+            "allowed_diff_lines": 1
+        }
         df = create_data_file(
             user_config=UserConfiguration(),
             path=foo,
-            type={
-                "name": "default",
-                "allowed_diff_lines": 1
-            }
+            type=data_type
         )
+        assert data_type["name"] == "default"
 
         bar = d / "bar.txt.gz"
         with gzip.open(bar, "wt") as out:
@@ -197,6 +239,93 @@ def test_data_resolver():
         assert resolver.resolve("bar", dd) == 1
 
 
+def test_data_resolver_prefetch():
+    def download_file(url, destination, **kwargs):
+        with open(destination, "wt") as out:
+            out.write(url.rsplit("/", 1)[1])
+
+    with tempdir() as d, patch(
+        "pytest_wdl.localizers.download_file", Mock(side_effect=download_file)
+    ) as mock_download:
+        test_data = {
+            "foo": {
+                "url": "http://example.com/foo.txt"
+            },
+            "bar": {
+                "class": "file",
+                "value": {
+                    "url": "http://example.com/bar.txt",
+                    "path": "bar.txt"
+                }
+            },
+            "baz": {
+                "contents": "baz"
+            },
+            "qux": 1
+        }
+        resolver = DataResolver(
+            test_data, UserConfiguration(None, cache_dir=d, prefetch_workers=2)
+        )
+        foo = resolver.resolve("foo")
+        bar = resolver.resolve("bar")
+        assert mock_download.call_count == 2
+        with open(foo.path, "rt") as inp:
+            assert inp.read() == "foo.txt"
+        with open(bar.path, "rt") as inp:
+            assert inp.read() == "bar.txt"
+        assert mock_download.call_count == 2
+        assert resolver.resolve("qux") == 1
+        resolver.close()
+        assert resolver._prefetch_executor is None
+
+
+def test_data_resolver_prefetch_close():
+    started = threading.Event()
+    release = threading.Event()
+
+    def download_file(url, destination, **kwargs):
+        started.set()
+        release.wait(5)
+        with open(destination, "wt") as out:
+            out.write("foo")
+
+    with tempdir() as d, patch(
+        "pytest_wdl.localizers.download_file", Mock(side_effect=download_file)
+    ) as mock_download:
+        resolver = DataResolver(
+            {
+                "foo": {"url": "http://example.com/foo.txt"},
+                "bar": {"url": "http://example.com/bar.txt"},
+            },
+            UserConfiguration(None, cache_dir=d, prefetch_workers=1)
+        )
+        assert started.wait(5)
+        # The second download is still pending, so it is cancelled, and close
+        # waits for the running download to complete
+        threading.Timer(0.1, release.set).start()
+        resolver.close()
+        assert mock_download.call_count == 1
+        assert not resolver._prefetched
+
+
+def test_data_resolver_prefetch_error(caplog):
+    with tempdir() as d, patch(
+        "pytest_wdl.localizers.download_file",
+        Mock(side_effect=[RuntimeError("boom"), RuntimeError("boom")])
+    ):
+        resolver = DataResolver(
+            {"foo": {"url": "http://example.com/foo.txt"}},
+            UserConfiguration(None, cache_dir=d, prefetch_workers=1)
+        )
+        with pytest.raises(RuntimeError):
+            resolver.resolve("foo").path
+        resolver.close()
+    assert any(
+        record.levelname == "WARNING" and "Error prefetching foo" in record.message
+        for record in caplog.records
+    )
+
+
 def test_data_resolver_env():
     with tempdir() as d:
         path = d / "foo.txt"
@@ -382,6 +511,47 @@ def test_data_manager():
     assert {"foo": 1, "bork": 2} == dm.get_dict("foo", bork="bar")
 
 
+def test_data_manager_caches_values():
+    resolver = Mock()
+    resolver.resolve.side_effect = lambda name, datadirs: [name]
+    dm = DataManager(data_resolver=resolver, datadirs=None)
+    foo = dm["foo"]
+    assert dm["foo"] is foo
+    assert dm.get_dict("foo", bar="foo") == {"foo": foo, "bar": foo}
+    resolver.resolve.assert_called_once_with("foo", None)
+
+
+def test_data_manager_prefetch():
+    def download_file(url, destination, **kwargs):
+        with open(destination, "wt") as out:
+            out.write(url.rsplit("/", 1)[1])
+
+    with tempdir() as d, patch(
+        "pytest_wdl.localizers.download_file", Mock(side_effect=download_file)
+    ) as mock_download:
+        config = UserConfiguration(cache_dir=d)
+        resolver = DataResolver({
+            "foo": {"contents": "foo", "path": "foo.txt"},
+            "bar": {"contents": "bar", "path": "bar.txt"},
+            "baz": 1,
+            "qux": {"url": "http://example.com/qux.txt"},
+        }, config)
+        dm = DataManager(resolver, datadirs=None)
+        # Prefetching is delegated to the resolver, which localizes the files in
+        # the background; resolving an entry waits for its localization
+        dm.prefetch("foo", "baz")
+        assert set(resolver._prefetched) == {"foo"}
+        assert dm["foo"].path.read_text() == "foo"
+        assert not (d / "bar.txt").exists()
+        # By default, only remote files are prefetched
+        dm.prefetch()
+        assert set(resolver._prefetched) == {"qux"}
+        with open(dm["qux"].path, "rt") as inp:
+            assert inp.read() == "qux.txt"
+        assert mock_download.call_count == 1
+        assert not (d / "bar.txt").exists()
+
+
 def test_http_header_set_in_workflow_data():
     """
     Test that workflow data file can define the HTTP Headers. This is
@@ -426,3 +596,110 @@ def test_http_header_set_in_workflow_data():
         }
         with open(foo.path, "rt") as inp:
             assert inp.read() == "foo"
+
+
+def test_vcf_comparable_rows():
+    from pytest_wdl.data_types.vcf import comparable_rows, diff_vcf_columns
+
+    lines = [
+        b"##fileformat=VCFv4.2\n",
+        b"#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tS1\n",
+        b"1\t100\t.\tA\tG\t50\tPASS\tDP=10\tGT:DP\t1|0:10\n",
+        b"1\t200\t.\tC\tT\t40\tPASS\tDP=12\tGT\t0/1\n",
+    ]
+    assert list(comparable_rows(lines)) == [
+        b"1\t100\t.\tA\tG\tPASS\t0/1\n",
+        b"1\t200\t.\tC\tT\tPASS\t0/1\n",
+    ]
+    assert list(comparable_rows(lines, compare_phase=True)) == [
+        b"1\t100\t.\tA\tG\tPASS\t1|0\n",
+        b"1\t200\t.\tC\tT\tPASS\t0/1\n",
+    ]
+
+    with tempdir() as d:
+        vcf1 = d / "a.vcf"
+        vcf2 = d / "b.vcf"
+        with open(vcf1, "wb") as out:
+            out.writelines(lines)
+        with open(vcf2, "wb") as out:
+            out.writelines(lines[:2])
+            out.write(b"1\t100\t.\tA\tG\t99\tPASS\tDP=20\tGT:DP\t0|1:20\n")
+            out.write(b"1\t200\t.\tC\tT\t40\tPASS\tDP=12\tGT\t1/1\n")
+        assert diff_vcf_columns(vcf1, vcf2) == 1
+        assert diff_vcf_columns(vcf1, vcf2, compare_phase=True) == 2
+
+
+def test_vcf_comparable_rows_colon_in_columns():
+    from pytest_wdl.data_types.vcf import comparable_rows, diff_vcf_columns
+
+    # Records are truncated at the first ':', as with `cut -d ':' -f 1`, so
+    # anything after a ':' in an earlier column (e.g. a breakend ALT allele) is
+    # not compared
+    lines = [
+        b"1\t100\tbnd_1\tG\tG]2:321681]\t50\tPASS\tSVTYPE=BND\tGT:DP\t0/1:10\n",
+        b"1\t200\t.\tA\tT\t50\tPASS\t.\tGT:DP\t1|0:10\n",
+    ]
+    assert list(comparable_rows(lines)) == [
+        b"1\t100\tbnd_1\tG\tG]2\n",
+        b"1\t200\t.\tA\tT\tPASS\t0/1\n",
+    ]
+
+    with tempdir() as d:
+        vcf1 = d / "a.vcf"
+        vcf2 = d / "b.vcf"
+        with open(vcf1, "wb") as out:
+            out.writelines(lines)
+        with open(vcf2, "wb") as out:
+            out.write(
+                b"1\t100\tbnd_1\tG\tG]2:999999]\t50\tPASS\tSVTYPE=BND\tGT:DP\t0/1:10\n"
+                b"1\t200\t.\tA\tT\t50\tPASS\t.\tGT:DP\t0/1:10\n"
+            )
+        assert diff_vcf_columns(vcf1, vcf2) == 0
+
+
+def test_data_file_gz_isal():
+    pytest.importorskip("isal")
+    from pytest_wdl.data_types import _iter_stripped_lines
+    with tempdir() as d:
+        foo = d / "foo.txt.gz"
+        with gzip.open(foo, "wt") as out:
+            out.write("foo \nbar")
+        assert list(_iter_stripped_lines(foo, "gzip")) == [b"foo", b"bar"]
+
+
+def test_diff_default():
+    from pytest_wdl.data_types import diff_default
+
+    with tempdir() as d:
+        file1 = d / "file1.txt"
+        file2 = d / "file2.txt"
+        with open(file1, "wt") as out:
+            out.write("a\nb \nc\nd\ne\n")
+        with open(file2, "wt") as out:
+            out.write("a\nb\nx\ny\nz\ne")
+        # 'c' and 'd' are changed to 'x' and 'y', and 'z' is inserted
+        assert diff_default(file1, file2) == 3
+        assert diff_default(file2, file1) == 3
+        assert diff_default(file1, file1) == 0
+
+
+@pytest.mark.parametrize("lines1,lines2,expected", [
+    # Expected counts are the number of lines output by GNU diff 3.8
+    # `diff -y --suppress-common-lines`
+    ("abcdefg", "abcdefg", 0),
+    ("abcdefg", "axcdefg", 1),
+    ("abcdefg", "acdefgh", 2),
+    ("abcdefg", "axyzcdg", 5),
+    ("abcdefg", "gabcdef", 2),
+    ("abcdefg", "bacdfeg", 4),
+    ("abcd", "wxyz", 4),
+    ("abc", "abcde", 2),
+    ("", "ab", 2),
+])
+def test_count_diff_lines(lines1, lines2, expected):
+    from pytest_wdl.data_types import count_diff_lines
+
+    assert count_diff_lines(list(lines1), list(lines2)) == expected
+    assert count_diff_lines(list(lines2), list(lines1)) == expected
+    # Lines may also be read lazily
+    assert count_diff_lines(iter(lines1), iter(lines2)) == expected
@@ -21,7 +21,7 @@ from pytest_wdl.utils import tempdir
 import pytest
 
 from pytest_wdl.utils import ENV_PATH, ENV_CLASSPATH
-from pytest_wdl.executors import ENV_JAVA_HOME
+from pytest_wdl.executors import ENV_JAVA_HOME, ExecutionFailedError
 from pytest_wdl.executors.cromwell_local import (
     ENV_CROMWELL_CONFIG, ENV_CROMWELL_JAR,  CromwellLocalExecutor
 )
@@ -201,6 +201,30 @@ def test_get_workflow_imports(user_config):
         assert zip_path == imports_file
 
 
+def test_get_workflow_imports_names():
+    with tempdir() as d:
+        # Paths with spaces are handled
+        wdl_dir1 = d / "foo bar"
+        wdl_dir1.mkdir()
+        with open(wdl_dir1 / "baz.wdl", "wt") as out:
+            out.write("baz")
+        # Directories and hidden files are not added
+        (wdl_dir1 / "qux.wdl").mkdir()
+        with open(wdl_dir1 / ".qux.wdl", "wt") as out:
+            out.write("qux")
+        zip_path = CromwellLocalExecutor._get_workflow_imports([wdl_dir1])
+        with zipfile.ZipFile(zip_path, "r") as import_zip:
+            assert import_zip.namelist() == ["baz.wdl"]
+
+        # File names must be unique
+        wdl_dir2 = d / "blorf"
+        wdl_dir2.mkdir()
+        with open(wdl_dir2 / "baz.wdl", "wt") as out:
+            out.write("blorf")
+        with pytest.raises(Exception):
+            CromwellLocalExecutor._get_workflow_imports([wdl_dir1, wdl_dir2])
+
+
 def test_failure_metadata(workflow_data):
     m44 = workflow_data["metadata44.json"]
     with open(m44.path, "rt") as inp:
@@ -236,3 +260,93 @@ def test_call_failure_metadata(workflow_data):
     assert failures.failed_task == "ScatterAt27_14"
     assert failures.failed_task_exit_status == "Unknown"
     assert "Failed to evaluate inputs for sub workflow" in failures._failed_task_stderr
+
+
+def test_get_cromwell_outputs():
+    output = "\n".join([
+        "[2020-01-01 00:00:00,00] [info] Running with database db.url = foo",
+        "[2020-01-01 00:00:01,00] [info] SingleWorkflowRunnerActor workflow finished",
+        "{",
+        '  "outputs": {',
+        '    "foo.bar": "baz {}",',
+        '    "foo.blorf": [1, 2]',
+        "  },",
+        '  "id": "0ac3ef6f-4e0a-4b7d-9c3c-5e4c5d5e5f5a"',
+        "}",
+        "[2020-01-01 00:00:02,00] [info] Shutting down",
+    ])
+    assert CromwellLocalExecutor._get_cromwell_outputs(output) == {
+        "foo.bar": "baz {}",
+        "foo.blorf": [1, 2],
+    }
+
+    with tempdir() as d:
+        stdout_file = d / "stdout.log"
+        with open(stdout_file, "wt") as out:
+            out.write(output)
+        assert CromwellLocalExecutor._get_cromwell_outputs(stdout_file) == {
+            "foo.bar": "baz {}",
+            "foo.blorf": [1, 2],
+        }
+
+        with open(stdout_file, "wt") as out:
+            out.write("foo\nUsage: java -jar")
+        with pytest.raises(Exception):
+            CromwellLocalExecutor._get_cromwell_outputs(stdout_file)
+
+        stdout_file.write_text("")
+        with pytest.raises(Exception):
+            CromwellLocalExecutor._get_cromwell_outputs(stdout_file)
+
+    with pytest.raises(AssertionError):
+        CromwellLocalExecutor._get_cromwell_outputs("foo\nbar\n{\n}")
+
+    with pytest.raises(Exception):
+        CromwellLocalExecutor._get_cromwell_outputs("foo\nUsage: java -jar")
+
+
+def test_get_workflow_imports_reuse():
+    with tempdir() as d:
+        wdl = d / "foo.wdl"
+        with open(wdl, "wt") as out:
+            out.write("foo")
+        zip_path1 = CromwellLocalExecutor._get_workflow_imports([d])
+        zip_path2 = CromwellLocalExecutor._get_workflow_imports([d])
+        assert zip_path1 == zip_path2
+
+        # The zip file is re-created if a WDL file changes
+        with open(wdl, "wt") as out:
+            out.write("foobar")
+        os.utime(wdl, ns=(0, 0))
+        zip_path3 = CromwellLocalExecutor._get_workflow_imports([d])
+        assert zip_path3 != zip_path1
+        with zipfile.ZipFile(zip_path3, "r") as import_zip:
+            with import_zip.open("foo.wdl", "r") as inp:
+                assert inp.read().decode() == "foobar"
+
+
+def test_failure_reports_inputs_file():
+    with tempdir() as d:
+        java = d / "java"
+        with open(java, "wt") as out:
+            out.write("#!/bin/sh\nexit 1\n")
+        make_executable(java)
+        jar = d / "cromwell.jar"
+        jar.touch()
+        wdl = d / "foo.wdl"
+        wdl.touch()
+        inputs_file = d / "inputs.json"
+        with open(inputs_file, "wt") as out:
+            json.dump({"foo.bar": 1}, out)
+
+        executor = CromwellLocalExecutor(
+            [d], java_bin=java, cromwell_jar_file=jar
+        )
+        with pytest.raises(ExecutionFailedError) as exc_info:
+            executor.run_workflow(
+                wdl,
+                workflow_name="foo",
+                inputs_file=inputs_file,
+                execution_dir=d
+            )
+        assert exc_info.value.inputs == {"foo.bar": 1}
@@ -13,13 +13,95 @@
 #    limitations under the License.
 
 import os
+import socket
+import sys
 import time
 
 import subby
 import pytest
 
-from pytest_wdl.executors import ENV_JAVA_HOME
+from pytest_wdl.executors import ENV_JAVA_ARGS, ENV_JAVA_HOME
 from pytest_wdl.executors.cromwell_local import ENV_CROMWELL_JAR
+from pytest_wdl.executors.cromwell_server import _SERVERS, CromwellServerExecutor
+from pytest_wdl.utils import tempdir
+from . import make_executable, setenv
+
+# Stands in for `java`, and serves the Cromwell status endpoint on the port
+# specified by -Dwebservice.port
+MOCK_JAVA = """#!{python}
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+port = int([a for a in sys.argv if a.startswith("-Dwebservice.port=")][0][18:])
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/engine/v1/status" else 404)
+        self.end_headers()
+
+HTTPServer(("localhost", port), Handler).serve_forever()
+"""
+
+
+def test_cromwell_server_launch():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+
+    with tempdir() as d:
+        java = d / "java"
+        with open(java, "wt") as out:
+            out.write(MOCK_JAVA.format(python=sys.executable))
+        make_executable(java)
+        jar = d / "cromwell.jar"
+        jar.touch()
+
+        with setenv({ENV_JAVA_ARGS: None}):
+            executor1 = CromwellServerExecutor(
+                launch_server=True, java_bin=java, cromwell_jar_file=jar,
+                server_port=port, server_startup_timeout=30
+            )
+            assert executor1._cromwell_api_url == (
+                f"http://localhost:{port}/api/workflows/v1"
+            )
+            server = _SERVERS[(java, None, jar, port)]
+            assert server.is_running
+
+            # The server is shared between executors
+            CromwellServerExecutor(
+                launch_server=True, java_bin=java, cromwell_jar_file=jar,
+                server_port=port
+            )
+            assert _SERVERS[(java, None, jar, port)] is server
+
+        server.stop()
+        assert not server.is_running
+
+
+def test_cromwell_server_launch_java_args_env():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        port = sock.getsockname()[1]
+
+    with tempdir() as d:
+        java = d / "java"
+        with open(java, "wt") as out:
+            out.write(MOCK_JAVA.format(python=sys.executable))
+        make_executable(java)
+        jar = d / "cromwell.jar"
+        jar.touch()
+
+        with setenv({ENV_JAVA_ARGS: "-Dfoo=bar"}):
+            CromwellServerExecutor(
+                launch_server=True, java_bin=java, cromwell_jar_file=jar,
+                server_port=port, server_startup_timeout=30
+            )
+        server = _SERVERS[(java, "-Dfoo=bar", jar, port)]
+        assert server.java_args == "-Dfoo=bar"
+        assert server.is_running
+
+        server.stop()
+        assert not server.is_running
 
 
 @pytest.mark.integration
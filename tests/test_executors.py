@@ -154,6 +154,13 @@ def test_get_workflow_inputs():
     assert actual_inputs_dict == {
         "foo.bar": 1
     }
+    # Identical inputs share a file
+    assert read_write_inputs(
+        inputs_dict={"bar": 1}, namespace="foo"
+    )[1] == inputs_path
+    assert read_write_inputs(
+        inputs_dict={"bar": 2}, namespace="foo"
+    )[1] != inputs_path
 
     with tempdir() as d:
         inputs_file = d / "inputs.json"
@@ -181,6 +188,9 @@ def test_get_workflow_inputs():
         with open(inputs_path, "rt") as inp:
             assert json.load(inp) == actual_inputs_dict
         assert actual_inputs_dict == inputs_dict
+        assert read_write_inputs(
+            namespace="foo", inputs_file=inputs_file, read_inputs_file=False
+        ) == (None, inputs_file)
 
 
 def test_inputs_formatter():
@@ -12,10 +12,18 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import json
+import os
 from pathlib import Path
-from pytest_wdl.config import ENV_USER_CONFIG, DEFAULT_USER_CONFIG_FILE
-from pytest_wdl.fixtures import import_dirs, user_config_file
-from pytest_wdl.utils import tempdir
+from unittest.mock import Mock, patch
+from pytest_wdl.config import (
+    ENV_USER_CONFIG, DEFAULT_USER_CONFIG_FILE, UserConfiguration
+)
+from pytest_wdl.fixtures import (
+    WorkflowRunner, clear_fixture_caches, import_dirs, user_config_file,
+    workflow_data_descriptors
+)
+from pytest_wdl.utils import ensure_path, tempdir
 import pytest
 from . import setenv, mock_request
 
@@ -51,6 +59,16 @@ def test_import_dirs():
         with pytest.raises(FileNotFoundError):
             import_dirs(req, d, foo)
 
+        bar = d / "bar"
+        bar.mkdir()
+        with open(foo, "wt") as out:
+            out.write(f"bar\n\n{d / 'baz'}\nblorf\n")
+        with pytest.raises(FileNotFoundError, match="baz.*blorf"):
+            import_dirs(req, d, foo)
+        with open(foo, "wt") as out:
+            out.write(f"bar\n\n{d}\n")
+        assert import_dirs(req, d, foo) == [bar.resolve(), d]
+
     with tempdir(change_dir=True) as tmp_cwd:
         tests = tmp_cwd / "tests"
         tests.mkdir()
@@ -58,3 +76,68 @@ def test_import_dirs():
 
     with tempdir(change_dir=True) as tmp_cwd:
         assert import_dirs(mock_request(tmp_cwd), None, None) == []
+
+
+def test_workflow_data_descriptors():
+    with tempdir() as d:
+        data_file = d / "test_data.json"
+        with open(data_file, "wt") as out:
+            json.dump({"foo": {"type": {"name": "default"}}}, out)
+        req = mock_request(d)
+
+        d1 = workflow_data_descriptors(req, d, data_file)
+        assert d1 == {"foo": {"type": {"name": "default"}}}
+        d1["bar"] = 1
+        d2 = workflow_data_descriptors(req, d, data_file)
+        assert "bar" not in d2
+
+        # Modifying the file invalidates the cached value
+        with open(data_file, "wt") as out:
+            json.dump({"baz": 2}, out)
+        stat = data_file.stat()
+        os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        assert workflow_data_descriptors(req, d, data_file) == {"baz": 2}
+
+
+def test_workflow_runner_execution_dir():
+    executor = Mock()
+    executor.run_workflow.return_value = {"foo": 1}
+    cwd = Path.cwd()
+
+    with tempdir() as d, patch(
+        "pytest_wdl.fixtures.create_executor", return_value=executor
+    ) as create_executor_mock:
+        wdl = d / "test.wdl"
+        wdl.touch()
+        execution_dir = d / "execution"
+        runner = WorkflowRunner(
+            [d], [], UserConfiguration(None, execution_dir=execution_dir), None,
+            ["mock"]
+        )
+        assert runner("test.wdl", {"bar": 2}) == {"mock": {"foo": 1}}
+        # The execution directory is passed to the executor and the current working
+        # directory is not changed
+        kwargs = executor.run_workflow.call_args[1]
+        assert kwargs["execution_dir"] == execution_dir
+        assert Path.cwd() == cwd
+        # The executor is reused for subsequent runs
+        # The WDL path is only resolved once
+        with patch("pytest_wdl.fixtures.ensure_path") as ensure_path_mock:
+            assert runner("test.wdl", {"bar": 3}) == {"mock": {"foo": 1}}
+            ensure_path_mock.assert_not_called()
+        create_executor_mock.assert_called_once()
+        assert executor.run_workflow.call_args[0][0] == wdl.resolve()
+
+        # Cached executors and paths are not shared with a later session
+        clear_fixture_caches()
+        with patch(
+            "pytest_wdl.fixtures.ensure_path", wraps=ensure_path
+        ) as ensure_path_mock:
+            runner("test.wdl", {"bar": 4})
+            ensure_path_mock.assert_called_once()
+        assert create_executor_mock.call_count == 2
+
+        # A WDL file that is deleted after it is resolved is not found
+        wdl.unlink()
+        with pytest.raises(FileNotFoundError):
+            runner("test.wdl", {"bar": 5})
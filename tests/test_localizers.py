@@ -11,12 +11,17 @@
 #    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
+import contextlib
+import hashlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
 import json
 import re
+import threading
+from unittest.mock import patch
 import pytest
 from pytest_wdl.config import UserConfiguration
 from pytest_wdl.localizers import (
-    LinkLocalizer, StringLocalizer, JsonLocalizer, UrlLocalizer
+    LinkLocalizer, StringLocalizer, JsonLocalizer, UrlLocalizer, download_file
 )
 from pytest_wdl.utils import DigestsNotEqualError, tempdir
 from . import GOOD_URL, no_internet, setenv
@@ -42,6 +47,19 @@ def test_string_localizer():
             assert inp.read() == "foo"
 
 
+def test_localizer_file_lock():
+    with tempdir() as d, patch("pytest_wdl.localizers.file_lock") as lock:
+        StringLocalizer("foo").localize(d / "foo")
+        LinkLocalizer(d / "foo").localize(d / "bar")
+        assert not lock.called
+
+        localizer = UrlLocalizer("http://foo.com/bar", UserConfiguration())
+        with patch.object(localizer, "_download") as download:
+            localizer.localize(d / "baz")
+            lock.assert_called_once_with(d / "baz")
+            download.assert_called_once_with(d / "baz")
+
+
 def test_json_localizer():
     with tempdir() as d:
         foo = d / "foo"
@@ -147,3 +165,196 @@ def test_url_localizer_set_proxies():
     assert len(proxies) == 1
     assert "https" in proxies
     assert proxies["https"] == "https://foo.com/proxy"
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    content = b"foobarbaz"
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(("HEAD", self.path, dict(self.headers)))
+        self.send_response(200)
+        self.send_header("ETag", f'"{hash(self.content)}"')
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/file")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start = 0
+        end = len(self.content)
+        etag = f'"{hash(self.content)}"'
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and if_range not in (None, etag):
+            # The file has changed, so send all of it
+            range_header = None
+        if range_header:
+            start_str, end_str = range_header[6:].split("-")
+            start = int(start_str)
+            if end_str:
+                end = int(end_str) + 1
+            if start >= len(self.content):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end - 1}/{len(self.content)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        self.wfile.write(self.content[start:end])
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def http_server():
+    server = HTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    RangeRequestHandler.requests = []
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_download_file_http():
+    with http_server() as url:
+        with tempdir() as d:
+            foo = d / "foo"
+            download_file(f"{url}/redirect", foo, http_headers={"X-Foo": "bar"})
+            with open(foo, "rb") as inp:
+                assert inp.read() == b"foobarbaz"
+            (path1, headers1), (path2, headers2) = RangeRequestHandler.requests
+            assert path1 == "/redirect" and headers1["X-Foo"] == "bar"
+            assert path2 == "/file" and "X-Foo" not in headers2
+
+            # Resume a partial download
+            etag = f'"{hash(RangeRequestHandler.content)}"'
+            RangeRequestHandler.requests.clear()
+            with open(d / "foo.part", "wb") as out:
+                out.write(b"foo")
+            (d / "foo.part.validator").write_text(etag)
+            download_file(f"{url}/file", foo)
+            with open(foo, "rb") as inp:
+                assert inp.read() == b"foobarbaz"
+            assert not (d / "foo.part").exists()
+            assert not (d / "foo.part.validator").exists()
+            assert RangeRequestHandler.requests[0][1]["Range"] == "bytes=3-"
+            assert RangeRequestHandler.requests[0][1]["If-Range"] == etag
+
+            # A partial download of a file that has since changed is discarded
+            RangeRequestHandler.requests.clear()
+            with open(d / "foo.part", "wb") as out:
+                out.write(b"bla")
+            (d / "foo.part.validator").write_text('"old"')
+            download_file(f"{url}/file", foo)
+            with open(foo, "rb") as inp:
+                assert inp.read() == b"foobarbaz"
+            assert len(RangeRequestHandler.requests) == 1
+            assert not (d / "foo.part.validator").exists()
+
+            # A partial download without a validator is not resumed
+            RangeRequestHandler.requests.clear()
+            with open(d / "foo.part", "wb") as out:
+                out.write(b"bla")
+            download_file(f"{url}/file", foo)
+            with open(foo, "rb") as inp:
+                assert inp.read() == b"foobarbaz"
+            assert "Range" not in RangeRequestHandler.requests[0][1]
+
+            # A partial download that is already complete is downloaded again
+            RangeRequestHandler.requests.clear()
+            with open(d / "foo.part", "wb") as out:
+                out.write(b"foobarbaz")
+            (d / "foo.part.validator").write_text(etag)
+            download_file(f"{url}/file", foo)
+            with open(foo, "rb") as inp:
+                assert inp.read() == b"foobarbaz"
+            assert len(RangeRequestHandler.requests) == 2
+
+
+def test_download_file_parallel_ranges():
+    pytest.importorskip("requests")
+    with http_server() as url, tempdir() as d, patch(
+        "pytest_wdl.localizers.PARALLEL_DOWNLOAD_MIN_SIZE", 4
+    ):
+        foo = d / "foo"
+        download_file(f"{url}/file", foo, max_workers=2)
+        with open(foo, "rb") as inp:
+            assert inp.read() == b"foobarbaz"
+        assert not (d / "foo.part").exists()
+        ranges = sorted(
+            headers["Range"] for path, headers in RangeRequestHandler.requests[1:]
+        )
+        assert ranges == ["bytes=0-4", "bytes=5-8"]
+
+
+def test_url_localizer_download_cache():
+    with tempdir() as d, http_server() as url:
+        download_cache_dir = d / "downloads"
+        config = UserConfiguration(
+            None, cache_dir=d / "cache", download_cache_dir=download_cache_dir
+        )
+        localizer = UrlLocalizer(f"{url}/file", config)
+        foo = d / "foo"
+        localizer.localize(foo)
+        with open(foo, "rb") as inp:
+            assert inp.read() == b"foobarbaz"
+        assert len(list(download_cache_dir.iterdir())) == 2
+
+        # The file is not downloaded again if its ETag has not changed
+        RangeRequestHandler.requests.clear()
+        bar = d / "bar"
+        localizer.localize(bar)
+        with open(bar, "rb") as inp:
+            assert inp.read() == b"foobarbaz"
+        assert [r[0] for r in RangeRequestHandler.requests] == ["HEAD"]
+
+        # The file is downloaded again if its ETag changes
+        RangeRequestHandler.requests.clear()
+        RangeRequestHandler.content = b"blorf"
+        try:
+            localizer.localize(bar)
+        finally:
+            RangeRequestHandler.content = b"foobarbaz"
+        with open(bar, "rb") as inp:
+            assert inp.read() == b"blorf"
+        with open(foo, "rb") as inp:
+            assert inp.read() == b"foobarbaz"
+        assert [r[0] for r in RangeRequestHandler.requests] == ["HEAD", "/file"]
+
+        # A cached file that matches the expected digests is used without
+        # contacting the server
+        RangeRequestHandler.requests.clear()
+        localizer = UrlLocalizer(
+            f"{url}/file", config, digests={"md5": hashlib.md5(b"blorf").hexdigest()}
+        )
+        baz = d / "baz"
+        localizer.localize(baz)
+        with open(baz, "rb") as inp:
+            assert inp.read() == b"blorf"
+        assert not RangeRequestHandler.requests
+
+        # Modifying a localized file does not modify the cached file
+        with open(baz, "ab") as out:
+            out.write(b"blammo")
+        qux = d / "qux"
+        localizer.localize(qux)
+        with open(qux, "rb") as inp:
+            assert inp.read() == b"blorf"
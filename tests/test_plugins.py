@@ -1,8 +1,11 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
-from pytest_wdl.plugins import plugin_factory_map
+from pytest_wdl import plugins
+from pytest_wdl.plugins import (
+    MetadataEntryPoint, MissingDependencyError, PluginFactory, plugin_factory_map
+)
 
 
 def test_plugin_factory_map():
@@ -24,3 +27,53 @@ def test_plugin_factory_map():
     entry_points.append(ep3)
     with pytest.raises(RuntimeError):
         plugin_factory_map(None, entry_points=entry_points)
+
+
+def test_plugin_factory():
+    class Foo:
+        pass
+
+    class Bar(Foo):
+        pass
+
+    ep = Mock()
+    ep.resolve.return_value = Bar
+    factory = PluginFactory(ep, Foo)
+    assert isinstance(factory(), Bar)
+    assert isinstance(factory(), Bar)
+    ep.resolve.assert_called_once()
+
+    ep = Mock()
+    ep.resolve.return_value = Foo
+    with pytest.raises(RuntimeError):
+        PluginFactory(ep, Bar)()
+
+    ep = Mock()
+    ep.resolve.return_value = lambda: Foo()
+    with pytest.raises(RuntimeError):
+        PluginFactory(ep, Bar)()
+
+
+@pytest.mark.skipif(plugins.metadata is None, reason="requires Python 3.10+")
+def test_metadata_entry_point():
+    ep = Mock()
+    ep.name = "bam"
+    ep.module = "pytest_wdl.data_types.bam"
+    ep.extras = ["bam"]
+    ep.dist.requires = ["xphyle>=4.1.3", 'pysam>=0.15.4; extra == "bam"']
+    wrapped = MetadataEntryPoint(ep)
+    assert wrapped.name == "bam"
+    assert wrapped.module_name == "pytest_wdl.data_types.bam"
+    assert wrapped.resolve() is ep.load.return_value
+
+    with patch.object(plugins.metadata, "distribution") as distribution:
+        wrapped.require()
+        distribution.assert_called_once_with("pysam")
+
+        distribution.side_effect = plugins.metadata.PackageNotFoundError("pysam")
+        with pytest.raises(MissingDependencyError):
+            wrapped.require()
+        assert plugin_factory_map(None, entry_points=[wrapped]) == {}
+
+    ep.extras = []
+    wrapped.require()
@@ -70,3 +70,51 @@ def test_url_schemes():
         assert handler.response_called is True
     finally:
         urllib.request._opener = opener
+
+
+class MockRangeResponse(MockResponse):
+    def __init__(self, url, offset):
+        super().__init__(url)
+        self.offset = offset
+        self.content = self.content[offset:]
+
+    def get_start_offset(self) -> int:
+        return self.offset
+
+
+class MockRangeHandler(MockHandler):
+    def __init__(self):
+        super().__init__()
+        self.ranges = []
+
+    def urlopen(self, request: Request) -> Response:
+        range_header = request.get_header("Range")
+        self.ranges.append(range_header)
+        offset = int(range_header[6:-1]) if range_header else 0
+        return MockRangeResponse(request.get_full_url(), offset)
+
+
+def test_download_resume():
+    opener = urllib.request._opener
+    handler = MockRangeHandler()
+    handler.alias()
+    try:
+        urllib.request.install_opener(urllib.request.build_opener(handler))
+
+        with tempdir() as d:
+            outfile = d / "foo"
+            partial = d / "foo.part"
+            with open(partial, "wt") as out:
+                out.write("bar")
+            download_file("foo://barbaz", outfile)
+            with open(outfile, "rt") as inp:
+                assert inp.read() == "barbaz"
+            assert not partial.exists()
+
+            download_file("foo://barbaz", outfile)
+            with open(outfile, "rt") as inp:
+                assert inp.read() == "barbaz"
+
+        assert handler.ranges == ["bytes=3-", None]
+    finally:
+        urllib.request._opener = opener
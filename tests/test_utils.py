@@ -12,9 +12,14 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import hashlib
+import json
 import os
 import stat
+import threading
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -23,11 +28,26 @@ from pytest_wdl.utils import (
     chdir,
     context_dir,
     ensure_path,
+    file_lock,
     resolve_file,
     find_executable_path,
+    find_in_classpath,
     find_project_path,
     env_map,
     safe_string,
+    compare_files_with_hash,
+    dumps_json,
+    file_digest,
+    hash_file,
+    read_json,
+    write_json,
+    DigestsNotEqualError,
+    clear_path_caches,
+    LOCK_FILE_COUNT,
+    _find_project_path,
+    _get_lock_dir,
+    _DIGESTS,
+    _PROJECT_PATHS,
 )
 from . import setenv, make_executable
 
@@ -77,6 +97,45 @@ def test_context_dir():
     assert not foo.exists()
 
 
+def test_file_lock():
+    with tempdir() as d:
+        lock_path = d / "foo"
+        events = []
+
+        def worker(name):
+            with file_lock(lock_path):
+                events.append(f"{name}-start")
+                time.sleep(0.05)
+                events.append(f"{name}-end")
+
+        threads = [
+            threading.Thread(target=worker, args=(name,)) for name in ("a", "b")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # No lock file is left next to the locked file
+        assert not list(d.iterdir())
+        # The lock is never held by both threads at the same time
+        assert events[0][0] == events[1][0]
+        assert events[2][0] == events[3][0]
+
+
+def test_file_lock_count():
+    with tempdir() as d:
+        for i in range(LOCK_FILE_COUNT * 2):
+            with file_lock(d / str(i)):
+                pass
+        lock_files = [
+            p for p in _get_lock_dir().iterdir()
+            if p.suffix == ".lock" and p.stem.isdigit()
+        ]
+        assert 0 < len(lock_files) <= LOCK_FILE_COUNT
+        assert all(int(p.stem) < LOCK_FILE_COUNT for p in lock_files)
+
+
 def test_ensure_path():
     cwd = Path.cwd()
     assert ensure_path(cwd) == cwd
@@ -153,6 +212,40 @@ def test_find_project_path():
             out.write("foo")
         assert find_project_path("foo", start=d, return_parent=False) == foo
         assert find_project_path("foo", start=d, return_parent=True) == d
+        # The result is reused while the file still exists, and only folders
+        # closer to the start folder are searched again
+        with patch(
+            "pytest_wdl.utils._find_project_path", wraps=_find_project_path
+        ) as find_mock:
+            assert find_project_path("foo", start=d) == foo
+            find_mock.assert_called_once_with(d, ("foo",), stop=d)
+        assert find_project_path("f?o", start=d) == foo
+        # A file created closer to the start folder takes precedence over a
+        # previous result
+        sub = d / "bar" / "baz"
+        sub.mkdir(parents=True)
+        assert find_project_path("foo", start=sub) == foo
+        bar_foo = d / "bar" / "foo"
+        bar_foo.touch()
+        assert find_project_path("foo", start=sub) == bar_foo
+        # A sequence of path elements is accepted
+        assert find_project_path(["bar", "foo"], start=sub) == bar_foo
+        bar_foo.unlink()
+        foo.unlink()
+        assert find_project_path("foo", start=d) is None
+        assert find_project_path("foo", start=sub) is None
+
+
+def test_clear_path_caches():
+    with tempdir() as d:
+        (d / "foo").touch()
+        find_project_path("foo", start=d)
+        file_digest(d / "foo")
+        assert _PROJECT_PATHS
+        assert _DIGESTS
+        clear_path_caches()
+        assert not _PROJECT_PATHS
+        assert not _DIGESTS
 
 
 def test_find_executable_path():
@@ -164,6 +257,12 @@ def test_find_executable_path():
         assert find_executable_path("foo", [d]) is None
         make_executable(f)
         assert find_executable_path("foo", [d]) == f
+        # A previously found executable is reused while it is still executable
+        with patch("shutil.which") as which_mock:
+            assert find_executable_path("foo", [d]) == f
+            which_mock.assert_not_called()
+        os.chmod(f, stat.S_IRUSR)
+        assert find_executable_path("foo", [d]) is None
 
 
 def test_find_executable_path_system():
@@ -178,6 +277,37 @@ def test_find_executable_path_system():
             assert find_executable_path("foo") == f
 
 
+def test_find_in_classpath():
+    with tempdir() as d:
+        jar_dir = d / "lib"
+        jar_dir.mkdir()
+        jar = jar_dir / "cromwell-50.jar"
+        jar.touch()
+        (jar_dir / "womtool-50.jar").touch()
+        other_jar = d / "cromwell-51.jar"
+        other_jar.touch()
+        missing = d / "missing"
+        with setenv({"CLASSPATH": os.pathsep.join((str(missing), str(jar_dir)))}):
+            assert find_in_classpath("cromwell*.jar") == jar
+            assert find_in_classpath("foo*.jar") is None
+        with setenv({"CLASSPATH": os.pathsep.join((str(other_jar), str(jar_dir)))}):
+            assert find_in_classpath("cromwell*.jar") == other_jar
+
+        # Unreadable classpath entries are skipped
+        scandir = os.scandir
+        unreadable = d / "unreadable"
+        unreadable.mkdir()
+
+        def mock_scandir(path):
+            if path == unreadable:
+                raise PermissionError(path)
+            return scandir(path)
+
+        with setenv({"CLASSPATH": os.pathsep.join((str(unreadable), str(jar_dir)))}):
+            with patch("os.scandir", side_effect=mock_scandir):
+                assert find_in_classpath("cromwell*.jar") == jar
+
+
 def test_env_map():
     with setenv(
         {"FOOVAR1": "http://foo.com",}
@@ -189,3 +319,86 @@ def test_env_map():
 
 def test_safe_string():
     assert safe_string("a+b*c") == "a_b_c"
+
+
+def test_compare_files_with_hash():
+    with tempdir() as d:
+        foo = d / "foo"
+        with open(foo, "wt") as out:
+            out.write("foo\nbar")
+        bar = d / "bar"
+        with open(bar, "wt") as out:
+            out.write("foo\nbar")
+        compare_files_with_hash(foo, bar)
+        assert hash_file(foo) == hash_file(bar)
+        # The digests computed while comparing are reused
+        with patch("pytest_wdl.utils._hash_file") as hash_mock:
+            assert file_digest(foo) == file_digest(bar)
+            hash_mock.assert_not_called()
+
+        # Same size, different contents
+        baz = d / "baz"
+        with open(baz, "wt") as out:
+            out.write("foo\nbaz")
+        with pytest.raises(DigestsNotEqualError):
+            compare_files_with_hash(foo, baz)
+
+        # Different size
+        blorf = d / "blorf"
+        with open(blorf, "wt") as out:
+            out.write("foo\nblorf")
+        with pytest.raises(DigestsNotEqualError):
+            compare_files_with_hash(foo, blorf)
+
+
+def test_file_digest():
+    with tempdir() as d:
+        foo = d / "foo"
+        with open(foo, "wt") as out:
+            out.write("foo")
+        digest = file_digest(foo)
+        assert digest == hashlib.blake2b(b"foo").digest()
+        with patch("pytest_wdl.utils._hash_file") as hash_mock:
+            assert file_digest(foo) == digest
+            hash_mock.assert_not_called()
+        # A modified file is hashed again
+        with open(foo, "wt") as out:
+            out.write("bar")
+        assert file_digest(foo) == hashlib.blake2b(b"bar").digest()
+        with pytest.raises(AssertionError):
+            file_digest(foo, "nohash")
+
+
+def test_file_digest_cache_size():
+    clear_path_caches()
+    with tempdir() as d, patch("pytest_wdl.utils.DIGESTS_CACHE_SIZE", 2):
+        paths = [d / name for name in ("foo", "bar", "baz")]
+        for path in paths:
+            path.write_text(path.name)
+            file_digest(path)
+        # The least recently used digest is evicted
+        assert [key[0] for key in _DIGESTS] == [str(path) for path in paths[1:]]
+
+
+def test_file_digest_xxhash():
+    xxhash = pytest.importorskip("xxhash")
+    with tempdir() as d:
+        foo = d / "foo"
+        with open(foo, "wt") as out:
+            out.write("foo")
+        assert file_digest(foo, "xxh3_128") == xxhash.xxh3_128(b"foo").digest()
+        bar = d / "bar"
+        with open(bar, "wt") as out:
+            out.write("foo")
+        compare_files_with_hash(foo, bar, "xxh3_128")
+
+
+def test_read_write_json():
+    with tempdir() as d:
+        foo = d / "foo.json"
+        obj = {"a": [1, 2.5, None], "b": {"c": "d"}, "e": d, 1: 2 ** 70}
+        write_json(obj, foo, default=str)
+        assert read_json(foo) == {
+            "a": [1, 2.5, None], "b": {"c": "d"}, "e": str(d), "1": 2 ** 70
+        }
+        assert json.loads(dumps_json(obj, default=str)) == read_json(foo)